@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Decode benchmark
+
+Compares the legacy SearxResults decode (full ``json.loads`` copied into a dict)
+with the lean decode path on large SearXNG payloads, reporting parse time,
+peak memory during decoding and memory retained afterwards.
+
+Usage:
+  python benchmarks/bench_decode.py                      # synthetic payloads
+  python benchmarks/bench_decode.py recorded/*.json      # recorded SearXNG responses
+  python benchmarks/bench_decode.py --backend json       # lean path without orjson
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+searx_module = importlib.import_module("searxng.client")
+SearxResults = searx_module.SearxResults
+
+
+class LegacySearxResults(dict):
+    """The original decode path, kept here as the baseline."""
+
+    def __init__(self, data):
+        super().__init__(json.loads(data))
+        self.__dict__ = self
+
+    @property
+    def results(self):
+        return self.get("results")
+
+
+def legacy_records(data):
+    res = LegacySearxResults(data)
+    return res, [
+        {
+            "snippet": r.get("content", ""),
+            "title": r["title"],
+            "link": r["url"],
+            "engines": r["engines"],
+            "category": r["category"],
+        }
+        for r in res.results
+        if r["url"]
+    ]
+
+
+def lean_records(data):
+    res = SearxResults(data)
+    return res, [r for r in res.results if r["url"]]
+
+
+def synthetic_payload(num_results: int, seed: int = 0) -> bytes:
+    """Build a response shaped like SearXNG's /search?format=json output."""
+    rnd = random.Random(seed)
+    words = ["search", "engine", "python", "async", "privacy", "latency", "result", "cache", "meta", "web"]
+
+    def text(n):
+        return " ".join(rnd.choice(words) for _ in range(n))
+
+    results = []
+    for i in range(num_results):
+        engines = rnd.sample(["google", "bing", "duckduckgo", "brave", "qwant", "mojeek"], rnd.randint(1, 3))
+        url = f"https://example{i % 50}.com/{text(3).replace(' ', '/')}/{i}"
+        results.append({
+            "url": url,
+            "title": text(8),
+            "content": text(60),
+            "engine": engines[0],
+            "engines": engines,
+            "positions": [rnd.randint(1, 20) for _ in engines],
+            "score": rnd.random() * 10,
+            "category": "general",
+            "template": "default.html",
+            "parsed_url": ["https", f"example{i % 50}.com", "/path", "", "", ""],
+            "pretty_url": url,
+            "publishedDate": "2024-01-01T00:00:00",
+            "img_src": "",
+            "thumbnail": "data:image/png;base64," + "A" * rnd.choice([0, 0, 2000, 8000]),
+            "priority": "",
+        })
+    payload = {
+        "query": "benchmark query",
+        "number_of_results": num_results * 1000,
+        "results": results,
+        "answers": [],
+        "corrections": [],
+        "infoboxes": [{"infobox": text(3), "content": text(400), "urls": [{"title": text(2), "url": "https://x"}] * 20}],
+        "suggestions": [text(3) for _ in range(10)],
+        "unresponsive_engines": [["bing", "timeout"]],
+    }
+    return json.dumps(payload).encode()
+
+
+def measure(fn, data, repeat: int):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    kept = fn(data)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return min(times), peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SearxResults decoding")
+    parser.add_argument("payloads", nargs="*", help="Recorded SearXNG JSON responses (default: synthetic)")
+    parser.add_argument("--sizes", default="100,500,2000", help="Synthetic payload sizes in results")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions (best is reported)")
+    parser.add_argument("--backend", choices=["auto", "json"], default="auto", help="JSON backend of the lean path")
+    args = parser.parse_args()
+
+    if args.backend == "json":
+        searx_module._loads = json.loads
+    backend = getattr(searx_module._loads, "__module__", "json") or "json"
+
+    if args.payloads:
+        cases = [(os.path.basename(path), open(path, "rb").read()) for path in args.payloads]
+    else:
+        cases = [(f"synthetic-{n}", synthetic_payload(n)) for n in map(int, args.sizes.split(","))]
+
+    print(f"lean backend: {backend}")
+    print(f"{'payload':<22}{'size':>10}  {'path':<7}{'time ms':>10}{'peak KiB':>11}{'kept KiB':>11}")
+    for name, data in cases:
+        rows = [("legacy", measure(legacy_records, data, args.repeat)),
+                ("lean", measure(lean_records, data, args.repeat))]
+        for path, (elapsed, peak, retained) in rows:
+            print(f"{name:<22}{len(data) // 1024:>8}Ki  {path:<7}{elapsed * 1000:>10.2f}"
+                  f"{peak / 1024:>11.0f}{retained / 1024:>11.0f}")
+        (lt, lp, lr), (nt, np_, nr) = rows[0][1], rows[1][1]
+        print(f"{'':<22}{'':>10}  {'gain':<7}{lt / nt:>9.1f}x{lp / np_:>10.1f}x{lr / max(nr, 1):>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
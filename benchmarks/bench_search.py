@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Search benchmark
+
+Starts an in-process stub SearXNG server (see stub_server.py) and drives the
+search paths against it, offline:
+
+  search         searx_search() with refresh, i.e. a SearXNG request per call
+  search_cached  searx_search() answering the same query from the result cache
+  mcp            the MCP ``search`` tool through an in-memory MCP client
+  cli            the ``searxng.cli`` command in a subprocess per call
+
+For each scenario it reports throughput, p50/p95/p99 latency, peak and retained
+traced allocations (a separate, shorter pass under tracemalloc; this includes
+the in-process stub) and peak RSS. Results are written as JSON, and a previous
+result file can be compared against to catch regressions.
+
+Usage:
+  python benchmarks/bench_search.py
+  python benchmarks/bench_search.py --requests 500 --concurrency 32 --latency lognormal:0.05:0.6
+  python benchmarks/bench_search.py --output new.json --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# measure the code paths, not the client-side rate limiter or a shared disk cache
+os.environ.setdefault("SEARX_RATE_LIMIT", "0")
+os.environ.pop("SEARX_CACHE_DIR", None)
+
+from stub_server import add_stub_arguments, stub_from_args  # noqa: E402
+
+SCENARIOS = ("search", "search_cached", "mcp", "cli")
+# Metrics where a higher value is better; all other compared metrics are lower-is-better
+HIGHER_IS_BETTER = {"throughput"}
+COMPARED = ("throughput", "p50_ms", "p95_ms", "p99_ms")
+# Latency changes below this are noise, whatever their relative size (e.g. cache hits)
+MIN_DELTA_MS = 1.0
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+async def drive(call: Callable[[int], Awaitable[Any]], count: int, concurrency: int) -> Dict[str, Any]:
+    """Run call(0..count-1) with the given concurrency and summarize latencies."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    return {
+        "count": count,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(count / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def allocations(call: Callable[[int], Awaitable[Any]], count: int, concurrency: int) -> Dict[str, Any]:
+    """Peak and retained traced memory of a short run of call."""
+    tracemalloc.start()
+    try:
+        await drive(call, count, concurrency)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kib": round(peak / 1024), "alloc_retained_kib": round(retained / 1024)}
+
+
+def max_rss_kib(who: int = resource.RUSAGE_SELF) -> int:
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+async def run_scenarios(args: argparse.Namespace, url: str) -> Dict[str, Dict[str, Any]]:
+    from searxng.search import result_cache, searx_search
+    from searxng.session import session_scope
+
+    os.environ["SEARX_HOST"] = url
+    engines = args.engines.split(",") if args.engines else None
+    results: Dict[str, Dict[str, Any]] = {}
+    alloc_count = min(args.requests, args.alloc_requests)
+
+    async def search(index: int):
+        return await searx_search(url, f"bench query {index}", args.num_results, engines, refresh=True)
+
+    async def search_cached(index: int):
+        return await searx_search(url, "bench cached query", args.num_results, engines)
+
+    async with session_scope():
+        for name in args.scenarios:
+            if name == "search":
+                call = search
+            elif name == "search_cached":
+                await search_cached(0)
+                call = search_cached
+            elif name == "mcp":
+                results[name] = await run_mcp(args, engines, alloc_count)
+                continue
+            elif name == "cli":
+                results[name] = await run_cli(args, url)
+                continue
+            else:
+                raise SystemExit(f"unknown scenario: {name}")
+            stats = await drive(call, args.requests, args.concurrency)
+            stats.update(await allocations(call, alloc_count, args.concurrency))
+            stats["max_rss_kib"] = max_rss_kib()
+            results[name] = stats
+            print(f"  {name}: done", file=sys.stderr)
+    result_cache.clear()
+    return results
+
+
+async def run_mcp(args: argparse.Namespace, engines, alloc_count: int) -> Dict[str, Any]:
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from searxng.mcp import mcp
+
+    arguments = {"num_results": args.num_results, "refresh": True}
+    if engines:
+        arguments["engines"] = ",".join(engines)
+
+    async with create_connected_server_and_client_session(mcp._mcp_server) as client:
+        async def call(index: int):
+            result = await client.call_tool("search", {"query": f"bench mcp {index}", **arguments})
+            if result.isError:
+                raise RuntimeError(result.content[0].text)
+
+        stats = await drive(call, args.requests, args.concurrency)
+        stats.update(await allocations(call, alloc_count, args.concurrency))
+    stats["max_rss_kib"] = max_rss_kib()
+    print("  mcp: done", file=sys.stderr)
+    return stats
+
+
+async def run_cli(args: argparse.Namespace, url: str) -> Dict[str, Any]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    command = [sys.executable, "-m", "searxng.cli", "--host", url, "--refresh", "--json",
+               "--num-results", str(args.num_results)]
+    if args.engines:
+        command += ["--engines", args.engines]
+
+    async def call(index: int):
+        process = await asyncio.create_subprocess_exec(
+            *command, f"bench cli {index}",
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE, env=env,
+        )
+        _, stderr = await process.communicate()
+        if process.returncode:
+            raise RuntimeError(stderr.decode()[-200:])
+
+    # process start-up dominates; a handful of sequential runs is enough
+    stats = await drive(call, args.cli_requests, 1)
+    stats["max_rss_kib"] = max_rss_kib(resource.RUSAGE_CHILDREN)
+    print("  cli: done", file=sys.stderr)
+    return stats
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    columns = ("count", "errors", "throughput", "p50_ms", "p95_ms", "p99_ms", "alloc_peak_kib", "max_rss_kib")
+    print(f"{'scenario':<15}" + "".join(f"{c:>16}" for c in columns))
+    for name, stats in results.items():
+        print(f"{name:<15}" + "".join(f"{stats.get(c, ''):>16}" for c in columns))
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> bool:
+    """Print changes against baseline; return False if a metric regressed beyond tolerance."""
+    ok = True
+    print(f"\n{'scenario':<15}{'metric':<12}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        for metric in COMPARED:
+            old, new = baseline[name].get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            noise = metric.endswith("_ms") and abs(new - old) < MIN_DELTA_MS
+            flag = "  REGRESSION" if worse > tolerance and not noise else ""
+            ok = ok and not flag
+            print(f"{name:<15}{metric:<12}{old:>12}{new:>12}{change:>+10.1%}{flag}")
+    return ok
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    stub = stub_from_args(args)
+    url = await stub.start()
+    try:
+        results = await run_scenarios(args, url)
+    finally:
+        await stub.stop()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stub": {"latency": args.latency, "results_per_page": args.results_per_page,
+                     "content_size": args.content_size, "error_rate": args.error_rate,
+                     "rate_limit": args.rate_limit, "engine_delay": args.engine_delay},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "num_results": args.num_results,
+            "stub_requests": stub.requests,
+        },
+        "scenarios": results,
+    }
+    print_table(results)
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["scenarios"]
+        if not compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark searx_search, the MCP tool and the CLI against a stub SearXNG")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run (default: {','.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per scenario (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent calls (default: 16)")
+    parser.add_argument("--alloc-requests", type=int, default=50,
+                        help="Calls of the tracemalloc pass (default: 50)")
+    parser.add_argument("--cli-requests", type=int, default=10, help="Sequential CLI runs (default: 10)")
+    parser.add_argument("--num-results", type=int, default=10, help="num_results of each search (default: 10)")
+    parser.add_argument("--engines", default="", help="Comma-separated engines to request")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous result file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative change of a compared metric counted as regression (default: 0.2)")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
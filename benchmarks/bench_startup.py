@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+
+Measures the import cost of the entry points with ``python -X importtime`` in
+fresh interpreters: the median cumulative import time of each entry point, the
+slowest modules it imports and whether it loads modules it must not load at
+startup (e.g. ``requests`` for the CLI, which only needs the async client).
+
+Both are checked against a budget (startup_budget.json by default); the
+benchmark exits non-zero if an entry point exceeds its time budget or imports a
+forbidden module. Results are written as JSON and can be compared against a
+previous result file like the search benchmark's.
+
+Usage:
+  python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --runs 20 --top 15
+  python benchmarks/bench_startup.py --output new.json --compare benchmarks/results/startup-baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+# Import time changes below this are noise, whatever their relative size
+MIN_DELTA_MS = 5.0
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Self and cumulative import time (us) of every module loaded by importing module."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    if process.returncode:
+        raise SystemExit(f"importing {module} failed:\n{process.stderr[-2000:]}")
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in process.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(module: str, runs: int, top: int) -> Dict[str, Any]:
+    """Median import time of module over runs, with its slowest imports."""
+    totals: List[float] = []
+    samples: List[Dict[str, Tuple[int, int]]] = []
+    for _ in range(runs):
+        times = import_times(module)
+        totals.append(times[module][1] / 1000)
+        samples.append(times)
+    median = samples[totals.index(statistics.median_low(totals))]
+    slowest = sorted(median.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "max_ms": round(max(totals), 1),
+        "modules": len(median),
+        "slowest": [{"module": name, "self_ms": round(s / 1000, 1), "cumulative_ms": round(c / 1000, 1)}
+                    for name, (s, c) in slowest],
+        "imported": sorted(median),
+    }
+
+
+def check_budget(module: str, stats: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """Budget violations of an entry point."""
+    violations = []
+    limit = budget.get("max_ms")
+    if limit is not None and stats["median_ms"] > limit:
+        violations.append(f"{module}: {stats['median_ms']} ms exceeds budget of {limit} ms")
+    imported = set(stats["imported"])
+    for forbidden in budget.get("forbidden", []):
+        if forbidden in imported:
+            violations.append(f"{module}: imports {forbidden} at startup")
+    return violations
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    for module, stats in results.items():
+        print(f"{module}: median {stats['median_ms']} ms (min {stats['min_ms']}, max {stats['max_ms']}), "
+              f"{stats['modules']} modules")
+        for entry in stats["slowest"]:
+            print(f"  {entry['self_ms']:>8} ms self {entry['cumulative_ms']:>8} ms cumulative  {entry['module']}")
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> bool:
+    """Print changes against baseline; return False if an import time regressed beyond tolerance."""
+    ok = True
+    print(f"\n{'entry point':<20}{'baseline':>12}{'current':>12}{'change':>10}")
+    for module, stats in results.items():
+        old, new = baseline.get(module, {}).get("median_ms"), stats["median_ms"]
+        if not old:
+            continue
+        change = (new - old) / old
+        flag = "  REGRESSION" if change > tolerance and new - old >= MIN_DELTA_MS else ""
+        ok = ok and not flag
+        print(f"{module:<20}{old:>12}{new:>12}{change:>+10.1%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the searxng entry points")
+    parser.add_argument("--runs", type=int, default=9, help="Fresh interpreters per entry point (default: 9)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default: 10)")
+    parser.add_argument("--budget", default=BUDGET, help="Budget file (default: benchmarks/startup_budget.json)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/startup-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous result file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative import time increase counted as regression (default: 0.2)")
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+    results = {module: measure(module, args.runs, args.top) for module in budget}
+    print_report(results)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "entry_points": results,
+    }
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    ok = True
+    violations = [v for module, stats in results.items() for v in check_budget(module, stats, budget[module])]
+    if violations:
+        print("\nbudget exceeded:")
+        for violation in violations:
+            print(f"  {violation}")
+        ok = False
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["entry_points"]
+        ok = compare(results, baseline, args.tolerance) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
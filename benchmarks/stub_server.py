@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Stub SearXNG server
+
+An aiohttp server that mimics SearXNG's ``/search?format=json`` API closely
+enough for benchmarks, without network access. Response latency, payload size,
+error rate, rate limiting (429 with Retry-After) and per-engine delays are
+configurable; an engine whose delay exceeds the engine timeout is reported in
+``unresponsive_engines``, as SearXNG does when an engine times out.
+
+Usage:
+  python benchmarks/stub_server.py --port 8888 --latency lognormal:0.08:0.5
+  python benchmarks/stub_server.py --error-rate 0.05 --rate-limit 50 --engine-delay bing=1.5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import zlib
+from typing import Dict, Optional
+
+from aiohttp import web
+
+WORDS = ["search", "engine", "python", "async", "privacy", "latency", "result", "cache", "meta", "web"]
+
+
+class Latency:
+    """Latency distribution parsed from ``fixed:S``, ``uniform:LO:HI`` or ``lognormal:MEDIAN:SIGMA``."""
+
+    def __init__(self, spec: str = "fixed:0.05"):
+        kind, *args = spec.split(":")
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution: {spec}")
+        self.spec = spec
+
+    def sample(self, rnd: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.args[0]
+        if self.kind == "uniform":
+            return rnd.uniform(self.args[0], self.args[1])
+        median, sigma = self.args
+        return rnd.lognormvariate(0, sigma) * median
+
+
+class StubSearx:
+    """In-process SearXNG stand-in; ``await start()`` returns its base URL."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0.05",
+        results_per_page: int = 10,
+        content_size: int = 300,
+        pages: int = 5,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        engine_delays: Optional[Dict[str, float]] = None,
+        engine_timeout: float = 3.0,
+        seed: int = 0,
+    ):
+        self.latency = Latency(latency)
+        self.results_per_page = results_per_page
+        self.content_size = content_size
+        self.pages = pages
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.engine_delays = engine_delays or {}
+        self.engine_timeout = engine_timeout
+        self.rnd = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._window = (0, 0)
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self.search)
+        app.router.add_get("/search", self.search)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _over_rate(self) -> bool:
+        if self.rate_limit <= 0:
+            return False
+        second = int(time.monotonic())
+        start, count = self._window
+        count = count + 1 if start == second else 1
+        self._window = (second, count)
+        return count > self.rate_limit
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self._over_rate():
+            self.throttled += 1
+            return web.Response(status=429, text="Too Many Requests", headers={"Retry-After": "1"})
+        query = request.query.get("q", "")
+        pageno = int(request.query.get("pageno", "1"))
+        engines = [e for e in request.query.get("engines", "").split(",") if e] or ["google", "duckduckgo"]
+        latency = self.latency.sample(self.rnd)
+        # SearXNG waits for its slowest engine, up to the engine timeout
+        delays = [self.engine_delays.get(engine, 0.0) for engine in engines]
+        await asyncio.sleep(max(latency, min(max(delays), self.engine_timeout)))
+        if self.rnd.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=502, text="Bad Gateway")
+        answered = [e for e, d in zip(engines, delays) if d <= self.engine_timeout]
+        payload = self.payload(query, pageno, answered)
+        payload["unresponsive_engines"] = [[e, "timeout"] for e in engines if e not in answered]
+        return web.Response(body=json.dumps(payload).encode(), content_type="application/json")
+
+    def payload(self, query: str, pageno: int, engines) -> dict:
+        rnd = random.Random(zlib.crc32(f"{query}/{pageno}".encode()))
+        results = []
+        if pageno <= self.pages and engines:
+            for i in range(self.results_per_page):
+                words = max(1, self.content_size // 7)
+                results.append({
+                    "url": f"https://example{i % 50}.com/{query.replace(' ', '-')}/{pageno}/{i}",
+                    "title": f"{query} result {pageno}-{i}",
+                    "content": " ".join(rnd.choice(WORDS) for _ in range(words)),
+                    "engine": engines[0],
+                    "engines": engines,
+                    "positions": [i + 1] * len(engines),
+                    "score": 1.0 / (i + 1),
+                    "category": "general",
+                    "template": "default.html",
+                    "parsed_url": ["https", f"example{i % 50}.com", "/", "", "", ""],
+                    "publishedDate": None,
+                    "thumbnail": "",
+                })
+        return {
+            "query": query,
+            "number_of_results": len(results) * self.pages,
+            "results": results,
+            "answers": [],
+            "corrections": [],
+            "infoboxes": [],
+            "suggestions": [f"{query} {w}" for w in WORDS[:5]],
+            "unresponsive_engines": [],
+        }
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "errors": self.errors, "throttled": self.throttled})
+
+
+def parse_engine_delays(values) -> Dict[str, float]:
+    delays = {}
+    for value in values or []:
+        engine, _, delay = value.partition("=")
+        delays[engine] = float(delay)
+    return delays
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", default="fixed:0.05",
+                        help="Latency distribution: fixed:S, uniform:LO:HI or lognormal:MEDIAN:SIGMA (default: fixed:0.05)")
+    parser.add_argument("--results-per-page", type=int, default=10, help="Results per page (default: 10)")
+    parser.add_argument("--content-size", type=int, default=300, help="Approximate snippet size in bytes (default: 300)")
+    parser.add_argument("--pages", type=int, default=5, help="Pages with results per query (default: 5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 502 (default: 0)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Requests per second above which 429 is returned (default: 0, unlimited)")
+    parser.add_argument("--engine-delay", action="append", metavar="ENGINE=SECONDS",
+                        help="Extra delay of an engine, repeatable")
+    parser.add_argument("--engine-timeout", type=float, default=3.0,
+                        help="Engines slower than this are reported unresponsive (default: 3)")
+
+
+def stub_from_args(args: argparse.Namespace) -> StubSearx:
+    return StubSearx(
+        latency=args.latency,
+        results_per_page=args.results_per_page,
+        content_size=args.content_size,
+        pages=args.pages,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        engine_delays=parse_engine_delays(args.engine_delay),
+        engine_timeout=args.engine_timeout,
+    )
+
+
+async def serve(args: argparse.Namespace) -> None:
+    stub = stub_from_args(args)
+    url = await stub.start(args.host, args.port)
+    print(f"stub SearXNG listening on {url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub SearXNG server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8888, help="Listen port (default: 8888)")
+    add_stub_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,42 @@
 
 __version__ = "0.5.0"
 
+import sys
+import types
+
+from .client import (
+    SearchHit,
+    SearxAPIError,
+    SearxConnectionError,
+    SearxDecodeError,
+    SearxError,
+    SearxRateLimitError,
+    SearxServerError,
+    SearxTimeoutError,
+)
 from .search import searx_search
 
-__all__ = ["searx_search"]
+__all__ = [
+    "searx_search",
+    "SearchHit",
+    "SearxError",
+    "SearxAPIError",
+    "SearxConnectionError",
+    "SearxDecodeError",
+    "SearxRateLimitError",
+    "SearxServerError",
+    "SearxTimeoutError",
+]
+
+
+class _Package(types.ModuleType):
+    """Keeps the searx_search() function exported when the (lazily imported)
+    searxng.searx_search module of the same name is loaded later on."""
+
+    def __setattr__(self, name, value):
+        if name == "searx_search" and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,133 @@
+"""
+Search Admission
+
+A long-lived MCP server shared by many agents must not let a burst of tool calls
+open an unbounded number of searches: each holds upstream connections, rate
+limit tokens and memory. This module caps the searches in flight server-wide;
+calls over the cap queue in arrival order for a bounded time and are then
+rejected. On shutdown the limit is closed, so queued and new searches are
+rejected while the running ones are drained.
+"""
+
+import asyncio
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List
+
+# Admission settings, overridable through the environment
+MAX_IN_FLIGHT = int(os.getenv("SEARX_MAX_IN_FLIGHT", "64"))
+QUEUE_TIMEOUT = float(os.getenv("SEARX_QUEUE_TIMEOUT", "10"))
+
+
+class ServerBusyError(RuntimeError):
+    """A search was not admitted: the server is at capacity or shutting down."""
+
+
+class InFlightLimit:
+    """Server-wide cap on concurrent searches, with graceful drain.
+
+    ``limit`` <= 0 disables the cap but still counts searches for drain.
+    """
+
+    def __init__(self, limit: int = 64, queue_timeout: float = 10.0):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.closed = False
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._idle: List[asyncio.Future] = []
+
+    async def acquire(self) -> None:
+        """Take a slot, queueing up to queue_timeout; raises ServerBusyError otherwise."""
+        if self.closed:
+            self.rejected += 1
+            raise ServerBusyError("Server is shutting down")
+        if self.limit <= 0 or (self.in_flight < self.limit and not self._waiters):
+            self._admit()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # the slot was handed over just as the wait timed out: keep it
+                return
+            self.rejected += 1
+            raise ServerBusyError(
+                f"Server busy: {self.in_flight} searches in flight, waited {self.queue_timeout:g}s"
+            ) from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # the slot was handed over just as we were cancelled
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        self.admitted += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and (self.limit <= 0 or self.in_flight < self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._admit()
+                waiter.set_result(None)
+        if self.in_flight == 0:
+            idle, self._idle = self._idle, []
+            for waiter in idle:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Stop admitting searches and reject the queued ones."""
+        self.closed = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.rejected += 1
+                waiter.set_exception(ServerBusyError("Server is shutting down"))
+
+    async def drain(self, timeout: float) -> bool:
+        """Close the limit and wait for running searches; False if timeout expired first."""
+        self.close()
+        if self.in_flight == 0:
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._idle.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "closed": self.closed,
+        }
+
+
+search_admission = InFlightLimit(MAX_IN_FLIGHT, QUEUE_TIMEOUT)
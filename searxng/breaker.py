@@ -0,0 +1,181 @@
+"""
+Engine Circuit Breakers
+
+Every SearXNG response lists the upstream engines that did not answer (timeout,
+CAPTCHA, access denied, ...) in ``unresponsive_engines``. An engine that keeps
+showing up there only slows every query down, so this module keeps a circuit
+breaker per host and engine: after a few consecutive failures the engine is
+left out of the ``engines`` param for a while, then a single half-open probe
+request decides whether it is closed again.
+
+Host level failures are handled the same way by the ejection and probing of
+:class:`~searxng.hosts.HostPool`; :func:`host_states` reports those alongside.
+"""
+
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .hosts import all_pools
+from .client import SearxError
+
+# Breaker settings, overridable through the environment
+ENGINE_FAILURE_THRESHOLD = int(os.getenv("SEARX_ENGINE_BREAKER_THRESHOLD", "3"))
+ENGINE_RESET_TIMEOUT = float(os.getenv("SEARX_ENGINE_BREAKER_RESET", "60"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class SearxCircuitOpenError(SearxError):
+    """Every requested engine is currently switched off by its circuit breaker."""
+
+    def __init__(self, host: str, engines: Sequence[str]):
+        super().__init__(f"Circuit open for {', '.join(engines)} on {host}")
+        self.host = host
+        self.engines = list(engines)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures. Once ``reset_timeout``
+    has passed, one request at a time is let through as a probe (half-open);
+    its success closes the breaker, its failure opens it again. A probe that
+    never reports back (e.g. a cancelled request) is replaced after another
+    ``reset_timeout``.
+    """
+
+    __slots__ = (
+        "failure_threshold", "reset_timeout", "consecutive_failures", "failures",
+        "opened_until", "probe_started", "reason",
+    )
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probe_started = 0.0
+        self.reason = ""
+
+    @property
+    def state(self) -> str:
+        if self.consecutive_failures < self.failure_threshold:
+            return CLOSED
+        return OPEN if self.opened_until > time.monotonic() else HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a request may go through, claiming the probe when half-open."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        now = time.monotonic()
+        if now - self.probe_started < self.reset_timeout:
+            return False
+        self.probe_started = now
+        return True
+
+    def success(self) -> None:
+        self.consecutive_failures = 0
+        self.probe_started = 0.0
+        self.reason = ""
+
+    def failure(self, reason: str = "") -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.probe_started = 0.0
+        self.reason = reason
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_until = time.monotonic() + self.reset_timeout
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failures": self.failures,
+            "reason": self.reason,
+            "retry_in_s": round(max(0.0, self.opened_until - time.monotonic()), 1),
+        }
+
+
+class EngineBreakers:
+    """Circuit breakers of the upstream engines, per SearXNG host."""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def _get(self, host: str, engine: str) -> CircuitBreaker:
+        breaker = self._breakers.get((host, engine))
+        if breaker is None:
+            breaker = self._breakers[(host, engine)] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def split(self, host: str, engines: Optional[Sequence[str]]) -> Tuple[List[str], List[str]]:
+        """Split requested engines into (allowed, skipped) for a request to host."""
+        allowed: List[str] = []
+        skipped: List[str] = []
+        for engine in engines or ():
+            (allowed if self._get(host, engine).allow() else skipped).append(engine)
+        return allowed, skipped
+
+    def record(
+        self,
+        host: str,
+        requested: Optional[Sequence[str]],
+        unresponsive: Iterable[Sequence[str]],
+        answered: Iterable[str] = (),
+    ) -> None:
+        """Feed the outcome of a response: its unresponsive engines and the engines seen in hits."""
+        failed = {}
+        for item in unresponsive:
+            # SearXNG reports [engine, reason] pairs
+            if item:
+                failed[item[0]] = item[1] if len(item) > 1 else ""
+        for engine, reason in failed.items():
+            self._get(host, engine).failure(reason)
+        for engine in set(requested or ()).union(answered):
+            if engine not in failed:
+                self._get(host, engine).success()
+
+    def failure(self, host: str, engines: Sequence[str], reason: str) -> None:
+        """Count a transport failure of a request against the engines it asked for."""
+        for engine in engines:
+            self._get(host, engine).failure(reason)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"host": host, "engine": engine, **breaker.stats()}
+            for (host, engine), breaker in sorted(self._breakers.items())
+        ]
+
+
+def host_states() -> List[Dict[str, Any]]:
+    """Breaker view of the host pools: ejected hosts are open, probed ones half-open."""
+    now = time.monotonic()
+    states = []
+    for pool in all_pools():
+        for host in pool.hosts:
+            if host.consecutive_failures < pool.eject_after:
+                state = CLOSED
+            elif host.ejected_until > now:
+                state = OPEN
+            else:
+                state = HALF_OPEN
+            states.append({
+                "host": host.url,
+                "state": state,
+                "consecutive_failures": host.consecutive_failures,
+                "failures": host.failures,
+                "retry_in_s": round(max(0.0, host.ejected_until - now), 1),
+            })
+    return states
+
+
+engine_breakers = EngineBreakers(ENGINE_FAILURE_THRESHOLD, ENGINE_RESET_TIMEOUT)
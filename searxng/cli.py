@@ -6,9 +6,16 @@ Command line interface for searching using SearXNG instances.
 """
 
 import argparse
+import json
+import os
 import sys
 import asyncio
-from .search import searx_search
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, TextIO, Union
+from .search import configure_disk_cache, searx_search
+from .session import session_scope
+from . import tracing
 
 
 def parse_arguments():
@@ -25,6 +32,7 @@ Examples:
   %(prog)s "python programming"
   %(prog)s "climate change" --engines "google,duckduckgo"
   %(prog)s "latest news" --categories "news" --num-results 5
+  %(prog)s --batch queries.txt --concurrency 32 > results.ndjson
 
 Available categories:
   {', '.join(CATEGORIES)}
@@ -35,14 +43,14 @@ Engines by category:
     )
     parser.add_argument(
         "query", 
-        nargs='+', 
+        nargs='*', 
         help="The search query"
     )
     parser.add_argument(
         "--host", 
         type=str, 
         default="http://localhost:8888", 
-        help="SearxNG host URL (default: %(default)s)"
+        help="SearxNG host URL, or a comma-separated list to balance over (default: %(default)s)"
     )
     parser.add_argument(
         "--num-results", 
@@ -66,29 +74,195 @@ Engines by category:
         choices=["day", "month", "year"],
         help="Time range for search results (optional, allowed: day, month, year)"
     )
+    parser.add_argument(
+        "--fanout",
+        action="store_true",
+        help="Query each engine with a separate concurrent request and merge the results"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Total time budget of a search in seconds; partial results are returned when it expires "
+             "(default: $SEARX_TIMEOUT or 30)"
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        default=None,
+        help="Duplicate requests that are slower than usual to another host (default: $SEARX_HEDGE)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Bypass the result cache and fetch fresh results"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=os.getenv("SEARX_CACHE_DIR"),
+        help="Directory of the persistent result cache shared with mcp-server (default: $SEARX_CACHE_DIR)"
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="FILE",
+        default=os.getenv("SEARX_TRACE"),
+        help="Append per-phase timings of each search to FILE as JSON lines; summarize them with "
+             "'python -m searxng.trace_summary FILE' (default: $SEARX_TRACE)"
+    )
     parser.add_argument(
         "--json",
         action="store_true",
         help="Output results in JSON format"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="FILE",
+        help="Read queries from FILE ('-' for stdin), one per line as plain text or a JSON object, "
+             "and write results as NDJSON"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of concurrent searches in batch mode (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        help="Write batch results in input order instead of completion order"
+    )
+    args = parser.parse_args()
+    if not args.query and not args.batch:
+        parser.error("a query or --batch is required")
+    return args
+
+
+def _split(value: Any) -> Optional[list]:
+    """Parse a comma-separated string (or pass through a list) of names."""
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in value.split(",")] if value else None
+
+
+def _read_specs(stream: TextIO, args) -> Iterator[Union[Dict[str, Any], ValueError]]:
+    """Yield one search spec per non-empty input line, using CLI options as defaults.
+
+    A malformed line yields a ValueError describing it instead, so that one bad
+    line does not end a long batch.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            spec = json.loads(line) if line.startswith("{") else {"query": line}
+            if not isinstance(spec, dict) or not isinstance(spec.get("query"), str) or not spec["query"].strip():
+                raise ValueError("expected a JSON object with a query")
+        except ValueError as e:
+            yield ValueError(f"Invalid input on line {number}: {e}")
+            continue
+        yield {
+            "query": spec["query"],
+            "num_results": spec.get("num_results", args.num_results),
+            "engines": _split(spec.get("engines", args.engines)),
+            "categories": _split(spec.get("categories", args.categories)),
+            "time_range": spec.get("time_range", args.time_range),
+        }
+
+
+async def run_batch(args) -> int:
+    """Stream searches from a file or stdin and write NDJSON results.
+
+    At most --concurrency searches are pending at any time, so memory stays flat
+    regardless of the input size.
+    """
+    stream = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    specs = _read_specs(stream, args)
+    limit = max(1, args.concurrency)
+    failed = 0
+
+    async def run(index: int, spec: Union[Dict[str, Any], ValueError]) -> Dict[str, Any]:
+        if isinstance(spec, ValueError):
+            return {"index": index, "query": None, "results": [], "error": str(spec)}
+        try:
+            results = await searx_search(
+                searx_host=args.host, refresh=args.refresh, raise_errors=True,
+                fanout=args.fanout, deadline=args.deadline, hedge=args.hedge, **spec
+            )
+            return {"index": index, "query": spec["query"], "results": results.to_dicts(), "error": None}
+        except Exception as e:
+            return {"index": index, "query": spec["query"], "results": [], "error": str(e) or type(e).__name__}
+
+    def emit(record: Dict[str, Any]) -> None:
+        nonlocal failed
+        failed += record["error"] is not None
+        sys.stdout.write(json.dumps(record) + "\n")
+
+    index = 0
+    pending: deque = deque()
+    try:
+        while True:
+            # read input in chunks off the event loop so a slow stdin never blocks searches
+            chunk = await asyncio.to_thread(lambda: list(islice(specs, limit)))
+            if not chunk:
+                break
+            for spec in chunk:
+                while len(pending) >= limit:
+                    if args.ordered:
+                        emit(await pending.popleft())
+                    else:
+                        done, rest = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        pending = deque(rest)
+                        for task in done:
+                            emit(task.result())
+                pending.append(asyncio.ensure_future(run(index, spec)))
+                index += 1
+        if args.ordered:
+            while pending:
+                emit(await pending.popleft())
+        else:
+            for task in asyncio.as_completed(pending):
+                emit(await task)
+    finally:
+        # only left over when the batch is aborted, e.g. by an unreadable input
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if stream is not sys.stdin:
+            stream.close()
+        sys.stdout.flush()
+
+    return 1 if failed else 0
 
 
 async def main_async():
     """Main entry point for the CLI."""
     args = parse_arguments()
-    engines = [engine.strip() for engine in args.engines.split(",")] if args.engines else None
-    categories = [category.strip() for category in args.categories.split(",")] if args.categories else None
+    engines = _split(args.engines)
+    categories = _split(args.categories)
     query = " ".join(args.query)
+    configure_disk_cache(args.cache_dir)
+    tracing.configure(args.trace)
+
+    if args.batch:
+        async with session_scope():
+            return await run_batch(args)
    
-    results = await searx_search(
-        searx_host=args.host,
-        query=query,
-        num_results=args.num_results,
-        engines=engines,
-        categories=categories,
-        time_range=args.time_range,
-    )
+    async with session_scope():
+        results = await searx_search(
+            searx_host=args.host,
+            query=query,
+            num_results=args.num_results,
+            engines=engines,
+            categories=categories,
+            time_range=args.time_range,
+            refresh=args.refresh,
+            fanout=args.fanout,
+            deadline=args.deadline,
+            hedge=args.hedge,
+        )
     
     if not results:
         if args.json:
@@ -99,17 +273,22 @@ async def main_async():
     
     # Display results
     if args.json:
-        import json
-        print(json.dumps(results, indent=2))
+        print(json.dumps(results.to_dicts(), indent=2))
     else:
         for i, result in enumerate(results, 1):
-            print(f"{i}. {result['title']}")
-            print(f"    URL: {result['url']}")
-            print(f"Content: {result['content']}")
-            print(f"Engines: {result['engines']}")
+            print(f"{i}. {result.title}")
+            print(f"    URL: {result.url}")
+            print(f"Content: {result.content}")
+            print(f"Engines: {list(result.engines)}")
             print()
         
         print(f"Found {len(results)} results.")
+        if results.dropped_engines:
+            print(f"Dropped engines: {', '.join(results.dropped_engines)}")
+        elif results.timed_out:
+            print("Search deadline expired, results may be incomplete.")
+        elif results.truncated:
+            print("Some result pages failed, results may be incomplete.")
     return 0
 
 
@@ -0,0 +1,507 @@
+"""
+SearXNG API Client
+
+The core of every search: the error hierarchy, the lean response decoding into
+:class:`SearchHit` records and :class:`SearxClient`, which queries a SearXNG
+host over the shared aiohttp session (or the shared ``requests`` session for
+sync callers).
+
+It deliberately avoids heavy imports: ``aiohttp`` is imported on the first
+async request and ``requests`` on the first sync one, so the CLI and a freshly
+spawned MCP server start without paying for an HTTP stack they may not use.
+The pydantic based :class:`~searxng.searx_search.SearxSearchWrapper` lives in
+:mod:`searxng.searx_search`.
+"""
+
+import asyncio
+import json
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, Dict, List, Optional, Tuple, Union
+
+from .ratelimit import THROTTLE_STATUSES, RateLimitExceeded, get_limiter, parse_retry_after
+from .session import get_sync_session, request_session
+from .tracing import add_span, span
+
+try:
+    # optional faster JSON backend
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+
+# Result fields kept from the Searx API response
+RESULT_FIELDS = ("title", "url", "content", "engines", "category", "score")
+
+
+def _get_default_params() -> dict:
+    return {"language": "en", "format": "json", "categories": ["web"], }
+
+
+class SearxError(ValueError):
+    """Base class of Searx API errors.
+
+    ``transient`` tells whether repeating the (idempotent) request may succeed.
+    Derives from ValueError, which the API errors used to be raised as.
+    """
+
+    transient = False
+
+
+class SearxConnectionError(SearxError):
+    """The Searx host could not be reached or dropped the connection."""
+
+    transient = True
+
+
+class SearxTimeoutError(SearxError, TimeoutError):
+    """A Searx API request or search deadline timed out.
+
+    ``deadline`` tells that the caller's time budget ran out, rather than a
+    per-request timeout of the host; the host and its engines are not to blame.
+    """
+
+    transient = True
+
+    def __init__(self, message: str = "", deadline: bool = False):
+        super().__init__(message)
+        self.deadline = deadline
+
+
+class SearxDecodeError(SearxError):
+    """Searx API answered with a body that is not valid JSON."""
+
+
+class SearxAPIError(SearxError):
+    """Searx API answered with a non-OK HTTP status."""
+
+    def __init__(self, status: int, text: str = ""):
+        super().__init__(f"Searx API returned an error: {status} {text[:200]}".rstrip())
+        self.status = status
+
+
+class SearxServerError(SearxAPIError):
+    """Searx API failed with a 5xx status."""
+
+    transient = True
+
+
+class SearxRateLimitError(SearxAPIError):
+    """Searx API throttled us (429/503), or our own limiter refused to queue longer."""
+
+    transient = True
+
+    def __init__(self, status: int, text: str = "", retry_after: Optional[float] = None):
+        super().__init__(status, text)
+        self.retry_after = retry_after
+
+
+def _status_error(status: int, text: str, retry_after: Optional[float] = None) -> SearxAPIError:
+    """Typed error of a non-OK response status."""
+    if status in THROTTLE_STATUSES:
+        return SearxRateLimitError(status, text, retry_after)
+    if status >= 500:
+        return SearxServerError(status, text)
+    return SearxAPIError(status, text)
+
+
+def _decode(data: Union[str, bytes]) -> "SearxResults":
+    try:
+        return SearxResults(data)
+    except ValueError as e:
+        raise SearxDecodeError(f"Searx API returned invalid JSON: {e}") from e
+
+
+def _env_timeout(name: str, default: str) -> Optional[float]:
+    value = float(os.getenv(name, default))
+    return value if value > 0 else None
+
+
+@dataclass(frozen=True)
+class Timeouts:
+    """Per-request timeouts in seconds; None disables a limit."""
+
+    connect: Optional[float] = None
+    first_byte: Optional[float] = None
+    total: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "Timeouts":
+        """Read SEARX_CONNECT_TIMEOUT, SEARX_READ_TIMEOUT and SEARX_REQUEST_TIMEOUT."""
+        return cls(
+            connect=_env_timeout("SEARX_CONNECT_TIMEOUT", "5"),
+            first_byte=_env_timeout("SEARX_READ_TIMEOUT", "10"),
+            total=_env_timeout("SEARX_REQUEST_TIMEOUT", "15"),
+        )
+
+
+class Deadline:
+    """Remaining-time budget of one search, shared by failover, pages and fan-out."""
+
+    __slots__ = ("expires",)
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def check(self) -> None:
+        """Raise SearxTimeoutError once the budget is spent."""
+        if self.expired:
+            raise SearxTimeoutError("Search deadline exceeded", deadline=True)
+
+
+def _min_timeout(*values: Optional[float]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return min(values) if values else None
+
+
+def _budget_bound(budget: Optional[float], limit: Optional[float]) -> bool:
+    """Whether the caller's budget, not the per-request limit, was the timeout that fired."""
+    return budget is not None and (limit is None or budget < limit)
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """A single search result, as decoded from the Searx API.
+
+    Hits are immutable, so they are shared between caches and callers without
+    copying. Item access (``hit["url"]``) is kept for code written against the
+    former dict records.
+    """
+
+    title: str
+    url: str
+    content: str = ""
+    engines: Tuple[str, ...] = ()
+    category: str = ""
+    score: float = 0.0
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON friendly representation of the hit."""
+        return {
+            "title": self.title,
+            "url": self.url,
+            "content": self.content,
+            "engines": list(self.engines),
+            "category": self.category,
+            "score": self.score,
+        }
+
+
+class SearxResults(dict):
+    """Dict like wrapper around search api results.
+
+    Only the parts of the response this package uses are kept: ``answers``,
+    ``unresponsive_engines`` and the :data:`RESULT_FIELDS` of each result.
+    Infoboxes, suggestions, thumbnails and other result fields are dropped right
+    after decoding, and the result records are built on first access.
+    """
+
+    __slots__ = ("_raw_results", "_hits")
+
+    def __init__(self, data: Union[str, bytes]):
+        """Take a raw result from Searx and make it into a dict like object."""
+        json_data = _loads(data)
+        super().__init__(
+            answers=json_data.get("answers") or [],
+            unresponsive_engines=json_data.get("unresponsive_engines") or [],
+        )
+        self._raw_results = json_data.get("results") or []
+        self._hits: Optional[List[SearchHit]] = None
+
+    def __missing__(self, key: str) -> Any:
+        if key == "results":
+            return self.results
+        raise KeyError(key)
+
+    @property
+    def hits(self) -> List[SearchHit]:
+        """Results as :class:`SearchHit` records, built on first access."""
+        if self._hits is None:
+            self._hits = [
+                SearchHit(
+                    r.get("title") or "",
+                    r.get("url") or "",
+                    r.get("content") or "",
+                    tuple(r.get("engines") or ()),
+                    r.get("category") or "",
+                    r.get("score") or 0.0,
+                )
+                for r in self._raw_results
+            ]
+            self._raw_results = None
+        return self._hits
+
+    @property
+    def results(self) -> List[Dict[str, Any]]:
+        """Result records as dicts with the :data:`RESULT_FIELDS` only."""
+        results = dict.get(self, "results")
+        if results is None:
+            results = self["results"] = [hit.to_dict() for hit in self.hits]
+        return results
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "results":
+            return self.results
+        return super().get(key, default)
+
+    @property
+    def answers(self) -> Any:
+        """Helper accessor on the json result."""
+        return self.get("answers")
+
+    @property
+    def unresponsive_engines(self) -> List[List[str]]:
+        """Engines that failed to answer, as ``[name, reason]`` pairs."""
+        return self.get("unresponsive_engines")
+
+
+def _normalize_host(searx_host: str) -> Tuple[str, bool]:
+    """Add a missing url scheme; return the host and whether it is plain http."""
+    if not searx_host.startswith("http"):
+        print(  # noqa: T201
+            f"Warning: missing the url scheme on host \
+            ! assuming secure https://{searx_host} "
+        )
+        return "https://" + searx_host, False
+    return searx_host, searx_host.startswith("http://")
+
+
+def build_params(
+    base: dict,
+    query: str,
+    engines: Optional[List[str]] = None,
+    categories: Optional[List[str]] = None,
+    query_suffixes: Tuple[Optional[str], ...] = (),
+    extra: Optional[dict] = None,
+) -> dict:
+    """Build the Searx API params of one request on top of prepared base params."""
+    params = {**base, "q": query, **(extra or {})}
+    for suffix in query_suffixes:
+        if isinstance(suffix, str) and len(suffix) > 0:
+            params["q"] += " " + suffix
+    if isinstance(engines, list) and len(engines) > 0:
+        params["engines"] = ",".join(engines)
+    if isinstance(categories, list) and len(categories) > 0:
+        params["categories"] = ",".join(categories)
+    return params
+
+
+class SearxClient:
+    """Long-lived client for one Searx host.
+
+    Host normalization and default params are resolved once at construction, so
+    issuing a request only builds its params; pass ``normalize=False`` when host,
+    ``unsecure`` and params are already resolved. The client keeps no reference
+    to past responses. Use :func:`get_client` to share clients across calls.
+    """
+
+    __slots__ = (
+        "searx_host", "unsecure", "params", "headers", "query_suffix", "timeouts", "aiosession", "session",
+        "limiter",
+    )
+
+    def __init__(
+        self,
+        searx_host: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        query_suffix: Optional[str] = "",
+        unsecure: bool = False,
+        timeouts: Optional[Timeouts] = None,
+        aiosession: Optional[Any] = None,
+        session: Optional[Any] = None,
+        normalize: bool = True,
+    ):
+        if normalize:
+            searx_host, plain_http = _normalize_host(searx_host)
+            unsecure = unsecure or plain_http
+            params = {**_get_default_params(), **(params or {})}
+            for name in ("engines", "categories"):
+                if isinstance(params.get(name), list):
+                    params[name] = ",".join(params[name])
+        self.searx_host = searx_host
+        self.unsecure = unsecure
+        self.params = params
+        self.headers = headers
+        self.query_suffix = query_suffix
+        self.timeouts = timeouts or Timeouts.from_env()
+        self.aiosession = aiosession
+        self.session = session
+        self.limiter = get_limiter(self.searx_host)
+
+    def build_params(
+        self,
+        query: str,
+        engines: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        query_suffix: Optional[str] = "",
+        **kwargs: Any,
+    ) -> dict:
+        """Params of a request for query on top of the client defaults."""
+        return build_params(self.params, query, engines, categories, (self.query_suffix, query_suffix), kwargs)
+
+    def query(self, params: dict, timeout: Optional[float] = None) -> SearxResults:
+        """Actual request to searx API over the pooled requests session.
+
+        Blocking counterpart of :meth:`aquery`, safe to call from several
+        threads. requests has no total timeout, so the budget bounds the
+        connect and read timeouts instead.
+        """
+        with span("request", host=self.searx_host, pageno=params.get("pageno", 1)):
+            return self._query(params, timeout)
+
+    def _query(self, params: dict, timeout: Optional[float]) -> SearxResults:
+        import requests
+        if self.limiter is not None:
+            try:
+                started = time.perf_counter()
+                waited = self.limiter.wait(timeout)
+                if waited:
+                    add_span("rate_limit", started, time.perf_counter())
+            except RateLimitExceeded as e:
+                raise SearxRateLimitError(429, str(e), retry_after=e.wait) from None
+            if timeout is not None:
+                timeout -= waited
+        if timeout is not None and timeout <= 0:
+            # requests rejects a zero timeout rather than timing out
+            raise SearxTimeoutError(f"Searx API request to {self.searx_host} timed out", deadline=True)
+        session = self.session or get_sync_session()
+        try:
+            response = session.get(
+                self.searx_host,
+                headers=self.headers,
+                params=params,
+                verify=not self.unsecure,
+                timeout=(
+                    _min_timeout(self.timeouts.connect, timeout),
+                    _min_timeout(self.timeouts.first_byte, self.timeouts.total, timeout),
+                ),
+            )
+        except requests.Timeout as e:
+            limit = self.timeouts.connect if isinstance(e, requests.ConnectTimeout) else (
+                _min_timeout(self.timeouts.first_byte, self.timeouts.total)
+            )
+            raise SearxTimeoutError(
+                f"Searx API request to {self.searx_host} timed out: {e}", deadline=_budget_bound(timeout, limit)
+            ) from e
+        except requests.ConnectionError as e:
+            raise SearxConnectionError(f"Searx API request to {self.searx_host} failed: {e}") from e
+        if not response.ok:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code in THROTTLE_STATUSES and self.limiter is not None:
+                self.limiter.throttle(retry_after)
+            raise _status_error(response.status_code, response.text, retry_after)
+        data = response.content
+        with span("decode", bytes=len(data)):
+            results = _decode(data)
+        if self.limiter is not None:
+            self.limiter.success()
+        return results
+
+    async def aquery(self, params: dict, timeout: Optional[float] = None) -> SearxResults:
+        """Actual async request to searx API over a pooled session.
+
+        timeout caps the total time of this request, e.g. to the remaining
+        budget of the calling search, including the time queued by the host's
+        rate limiter. Throttling responses raise SearxRateLimitError and slow
+        the limiter down.
+        """
+        with span("request", host=self.searx_host, pageno=params.get("pageno", 1)):
+            return await self._aquery(params, timeout)
+
+    async def _aquery(self, params: dict, timeout: Optional[float]) -> SearxResults:
+        import aiohttp
+        if self.limiter is not None:
+            try:
+                started = time.perf_counter()
+                waited = await self.limiter.acquire(timeout)
+                if waited:
+                    add_span("rate_limit", started, time.perf_counter())
+            except RateLimitExceeded as e:
+                raise SearxRateLimitError(429, str(e), retry_after=e.wait) from None
+            if timeout is not None:
+                timeout -= waited
+        if timeout is not None and timeout <= 0:
+            # aiohttp treats a total timeout <= 0 as no timeout at all
+            raise SearxTimeoutError(f"Searx API request to {self.searx_host} timed out", deadline=True)
+        kwargs: Dict = {
+            "headers": self.headers,
+            "params": params,
+            "timeout": aiohttp.ClientTimeout(
+                total=_min_timeout(self.timeouts.total, timeout),
+                connect=self.timeouts.connect,
+                sock_read=self.timeouts.first_byte,
+            ),
+        }
+        if self.unsecure:
+            kwargs["ssl"] = False
+        try:
+            # the caller's session, else the shared one so connections are reused
+            async with self._session() as session, session.get(self.searx_host, **kwargs) as response:
+                if not response.ok:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if response.status in THROTTLE_STATUSES and self.limiter is not None:
+                        self.limiter.throttle(retry_after)
+                    raise _status_error(response.status, await response.text(), retry_after)
+                with span("download"):
+                    data = await response.read()
+                with span("decode", bytes=len(data)):
+                    results = _decode(data)
+        except asyncio.TimeoutError as e:
+            # connect and read timeouts are the host's; the total one may be the caller's budget
+            budget = not isinstance(e, aiohttp.ServerTimeoutError) and _budget_bound(timeout, self.timeouts.total)
+            raise SearxTimeoutError(f"Searx API request to {self.searx_host} timed out", deadline=budget) from e
+        except aiohttp.ClientError as e:
+            raise SearxConnectionError(f"Searx API request to {self.searx_host} failed: {e}") from e
+        if self.limiter is not None:
+            self.limiter.success()
+        return results
+
+    def _session(self) -> AsyncContextManager[Any]:
+        if self.aiosession is not None:
+            return nullcontext(self.aiosession)
+        return request_session()
+
+    async def ahits(
+        self,
+        query: str,
+        num_results: int,
+        engines: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> List[SearchHit]:
+        """Query asynchronously and return up to num_results hits with a url."""
+        params = self.build_params(query, engines, categories, **kwargs)
+        hits = (await self.aquery(params, timeout)).hits
+        return [hit for hit in hits if hit.url][:num_results]
+
+
+_clients: Dict[Tuple[str, Optional[Timeouts]], SearxClient] = {}
+
+
+def get_client(searx_host: str, timeouts: Optional[Timeouts] = None) -> SearxClient:
+    """Return the shared client for searx_host with default params."""
+    key = (searx_host, timeouts)
+    client = _clients.get(key)
+    if client is None:
+        if len(_clients) >= 256:
+            _clients.clear()
+        client = _clients[key] = SearxClient(searx_host, timeouts=timeouts)
+    return client
@@ -0,0 +1,152 @@
+"""
+Persistent Result Cache
+
+This module provides an optional SQLite backed cache for search results so that
+cached results survive MCP server restarts and are shared between processes.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .client import SearchHit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_expires ON results(expires);
+CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed);
+"""
+
+class DiskCache:
+    """SQLite (WAL mode) result cache shared by every process using the same directory.
+
+    Entries expire ``ttl`` seconds after being stored and the database is kept
+    under ``max_bytes`` by evicting the least recently accessed entries. Pruning
+    runs on a fraction of writes and uses indexes only, so opening the cache never
+    scans the store. Methods are blocking; call them from a worker thread in
+    async code.
+    """
+
+    FILENAME = "results.sqlite3"
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        prune_probability: float = 1 / 32,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.FILENAME)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.prune_probability = prune_probability
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls, directory: Optional[str] = None) -> Optional["DiskCache"]:
+        """Create a cache from SEARX_CACHE_DIR / SEARX_DISK_CACHE_* variables, if configured."""
+        directory = directory or os.getenv("SEARX_CACHE_DIR")
+        if not directory:
+            return None
+        return cls(
+            os.path.expanduser(directory),
+            ttl=float(os.getenv("SEARX_DISK_CACHE_TTL", "3600")),
+            max_bytes=int(os.getenv("SEARX_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, key: Tuple) -> Optional[List[SearchHit]]:
+        """Return cached results for key, or None if missing or expired."""
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT expires, accessed, payload FROM results WHERE key = ?", (_encode_key(key),)
+        ).fetchone()
+        if row is None or row[0] <= now:
+            self.misses += 1
+            return None
+        # refresh the LRU timestamp sparingly to keep reads mostly write-free
+        if now - row[1] > 60:
+            conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, _encode_key(key)))
+        self.hits += 1
+        return [
+            SearchHit(title, url, content, tuple(engines), category, score)
+            for title, url, content, engines, category, score in json.loads(row[2])
+        ]
+
+    def set(self, key: Tuple, results: List[SearchHit]) -> None:
+        """Store results under key, occasionally pruning expired and excess entries."""
+        # hits are stored compactly as positional lists
+        payload = json.dumps(
+            [[h.title, h.url, h.content, h.engines, h.category, h.score] for h in results],
+            separators=(",", ":"),
+        ).encode()
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, created, expires, accessed, size, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (_encode_key(key), now, now + self.ttl, now, len(payload), payload),
+        )
+        if random.random() < self.prune_probability:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired entries, then evict LRU entries until under the size cap."""
+        conn = self._connection()
+        conn.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+        while self._used_bytes(conn) > self.max_bytes:
+            deleted = conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed LIMIT 100)"
+            ).rowcount
+            if not deleted:
+                break
+
+    def _used_bytes(self, conn: sqlite3.Connection) -> int:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_count) * page_size
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def _encode_key(key: Tuple) -> str:
+    return json.dumps(key, separators=(",", ":"))
@@ -0,0 +1,129 @@
+"""
+Hedged Requests
+
+A slow engine behind SearXNG makes the odd request take several times longer
+than usual. Hedging sends a duplicate request (preferably to another host) when
+the first has not answered within a high percentile of recently observed
+latency, keeps the first good response and cancels the other. A token budget
+caps the share of requests that may be duplicated so hedging cannot double the
+load on the instances.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+# Hedging settings, overridable through the environment
+HEDGE = os.getenv("SEARX_HEDGE", "0").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("SEARX_HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET = float(os.getenv("SEARX_HEDGE_BUDGET", "0.1"))
+
+T = TypeVar("T")
+
+
+class Hedger:
+    """Hedging policy and statistics for requests to one primary host.
+
+    Each request earns ``budget`` hedge tokens (up to ``max_tokens``) and each
+    hedge spends one, so at most about ``budget`` of the requests are hedged
+    over time. No request is hedged before ``min_samples`` latencies are known.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        percentile: float = 95.0,
+        budget: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+        max_tokens: float = 10.0,
+    ):
+        self.url = url
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+        self.latencies: deque = deque(maxlen=window)
+        self.tokens = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.denied = 0
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    async def run(self, primary: Callable[[], Awaitable[T]], hedge: Callable[[], Awaitable[T]]) -> T:
+        """Await primary, starting hedge as well if primary is slow; first good result wins.
+
+        If both requests fail, the primary's error is raised.
+        """
+        self.requests += 1
+        self.tokens = min(self.max_tokens, self.tokens + self.budget)
+        delay = self.delay()
+        started = time.monotonic()
+        if delay is None:
+            result = await primary()
+            self.latencies.append(time.monotonic() - started)
+            return result
+
+        first = asyncio.ensure_future(primary())
+        tasks = {first: started}
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if not done and self.tokens >= 1:
+                self.tokens -= 1
+                self.hedged += 1
+                tasks[asyncio.ensure_future(hedge())] = time.monotonic()
+            elif not done:
+                self.denied += 1
+            pending = set(tasks)
+            errors: Dict[asyncio.Future, BaseException] = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        errors[task] = task.exception()
+                        continue
+                    if task is not first:
+                        self.hedge_wins += 1
+                    self.latencies.append(time.monotonic() - tasks[task])
+                    return task.result()
+            raise errors.get(first) or next(iter(errors.values()))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        delay = self.delay()
+        return {
+            "url": self.url,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "denied": self.denied,
+            "delay_ms": None if delay is None else round(delay * 1000, 1),
+        }
+
+
+_hedgers: Dict[str, Hedger] = {}
+
+
+def get_hedger(url: str) -> Hedger:
+    """Return the shared hedger of a primary host so latency history persists."""
+    hedger = _hedgers.get(url)
+    if hedger is None:
+        hedger = _hedgers[url] = Hedger(url, HEDGE_PERCENTILE, HEDGE_BUDGET)
+    return hedger
+
+
+def all_hedgers() -> List[Hedger]:
+    return list(_hedgers.values())
@@ -0,0 +1,147 @@
+"""
+SearXNG Host Pool
+
+This module balances requests over several SearXNG instances. Each request is
+routed to the host with the lowest expected latency (EWMA of response times
+weighted by in-flight requests); failing hosts are ejected for a while and then
+probed back in with a single request.
+"""
+
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+def parse_hosts(value: Union[str, Sequence[str]]) -> List[str]:
+    """Split a comma-separated host string (or list of them) into unique host URLs."""
+    items = [value] if isinstance(value, str) else list(value)
+    hosts: List[str] = []
+    for item in items:
+        for host in item.split(","):
+            host = host.strip()
+            if host and host not in hosts:
+                hosts.append(host)
+    return hosts
+
+
+class Host:
+    """Routing statistics of a single SearXNG instance."""
+
+    __slots__ = (
+        "url", "ewma", "in_flight", "requests", "failures",
+        "consecutive_failures", "ejected_until", "probing",
+    )
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ewma = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.probing = False
+
+    def score(self) -> float:
+        return self.ewma * (1 + self.in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "ewma_ms": round(self.ewma * 1000, 1),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejected": self.ejected_until > time.monotonic(),
+        }
+
+
+class HostPool:
+    """Latency-aware load balancer with ejection of failing hosts."""
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        alpha: float = 0.3,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+    ):
+        if not hosts:
+            raise ValueError("HostPool requires at least one host")
+        self.hosts = [Host(url) for url in hosts]
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+
+    def pick(self, exclude: Iterable[Host] = ()) -> Optional[Host]:
+        """Choose the best available host not in exclude, or None if none is left."""
+        excluded = set(id(h) for h in exclude)
+        candidates = [h for h in self.hosts if id(h) not in excluded]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        healthy = [h for h in candidates if h.ejected_until <= now and not h.probing]
+        # hosts whose ejection expired get a single probe request
+        for host in healthy:
+            if host.consecutive_failures >= self.eject_after:
+                host.probing = True
+                return host
+        if not healthy:
+            # everything is ejected: best effort on the host closest to recovery
+            return min(candidates, key=lambda h: h.ejected_until)
+        best = min(h.score() for h in healthy)
+        return random.choice([h for h in healthy if h.score() == best])
+
+    def alternate(self, host: Host) -> Optional[Host]:
+        """Best healthy host other than host, without claiming probes; None if there is none."""
+        now = time.monotonic()
+        healthy = [
+            h for h in self.hosts
+            if h is not host and h.ejected_until <= now and h.consecutive_failures < self.eject_after
+        ]
+        return min(healthy, key=lambda h: h.score(), default=None)
+
+    def start(self, host: Host) -> float:
+        host.in_flight += 1
+        host.requests += 1
+        return time.monotonic()
+
+    def success(self, host: Host, started: float) -> None:
+        latency = time.monotonic() - started
+        host.in_flight -= 1
+        host.ewma = latency if host.ewma == 0 else self.alpha * latency + (1 - self.alpha) * host.ewma
+        host.consecutive_failures = 0
+        host.ejected_until = 0.0
+        host.probing = False
+
+    def failure(self, host: Host) -> None:
+        host.in_flight -= 1
+        host.failures += 1
+        host.consecutive_failures += 1
+        host.probing = False
+        if host.consecutive_failures >= self.eject_after:
+            host.ejected_until = time.monotonic() + self.eject_seconds
+
+    def release(self, host: Host) -> None:
+        """Finish a request that neither succeeded nor failed (e.g. cancelled)."""
+        host.in_flight -= 1
+        host.probing = False
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [h.stats() for h in self.hosts]
+
+
+_pools: Dict[Tuple[str, ...], HostPool] = {}
+
+
+def get_pool(hosts: Sequence[str]) -> HostPool:
+    """Return the shared pool for this set of hosts so statistics persist across calls."""
+    key = tuple(hosts)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = HostPool(hosts)
+    return pool
+
+
+def all_pools() -> List[HostPool]:
+    return list(_pools.values())
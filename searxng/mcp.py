@@ -4,17 +4,64 @@ MCP Server for SearXNG Search
 This module implements a Model Context Protocol (MCP) server that provides access to SearXNG search functionality.
 """
 
+import argparse
+import asyncio
+import json
 import os
-from typing import List, Optional, Literal
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Literal
 from pydantic import BaseModel, Field
 from mcp.server.fastmcp import FastMCP, Context
 
-from .search import searx_search
+from .admission import MAX_IN_FLIGHT, search_admission
+from .metrics import (
+    METRICS_FILE, METRICS_INTERVAL, STATS_DIR, WORKER_ID, aggregate, dump_periodically, metrics, publish_periodically,
+)
+from .search import ResultList, searx_search
+from .client import SearchHit
+from .session import session_scope
+from .tracing import span, trace
+
+_holders = 0
+_dump: Optional[asyncio.Future] = None
+
+@asynccontextmanager
+async def shared_resources() -> AsyncIterator[None]:
+    """Hold the shared connection pool and metrics dump open while anyone uses them.
+
+    Over HTTP every client session enters the server lifespan, so the pool is
+    only closed when the last holder leaves. A worker publishes its metrics for
+    the supervisor instead of writing the metrics file itself.
+    """
+    global _holders, _dump
+    _holders += 1
+    if _holders == 1:
+        if WORKER_ID is not None and STATS_DIR:
+            _dump = asyncio.ensure_future(publish_periodically(STATS_DIR, WORKER_ID))
+        elif METRICS_FILE:
+            _dump = asyncio.ensure_future(dump_periodically(METRICS_FILE, METRICS_INTERVAL))
+    try:
+        async with session_scope():
+            yield
+    finally:
+        _holders -= 1
+        if _holders == 0:
+            dump, _dump = _dump, None
+            if dump is not None:
+                dump.cancel()
+                await asyncio.gather(dump, return_exceptions=True)
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Hold the shared connection pool open for the lifetime of the server"""
+    async with shared_resources():
+        yield
 
 # Create an MCP server
 mcp = FastMCP(
     "SearXNG Search",
     log_level="ERROR",
+    lifespan=lifespan,
 )
 
 # Define models for structured output
@@ -29,6 +76,37 @@ class SearchResults(BaseModel):
     results: List[SearchResult] = Field(description="List of search results")
     query: str = Field(description="The search query that was executed")
     total_results: int = Field(description="The number of results returned")
+    dropped_engines: List[str] = Field(default_factory=list, description="Engines left out because they failed or missed the deadline")
+    partial: bool = Field(default=False, description="Whether the deadline cut the search short")
+
+class SearchQuery(BaseModel):
+    """A single query of a batch search"""
+    query: str = Field(description="The search query")
+    num_results: int = Field(default=10, description="The number of results to return")
+    engines: Optional[str] = Field(default=None, description="Comma-separated list of engines to use")
+    categories: Optional[str] = Field(default=None, description="Comma-separated list of categories to use")
+    time_range: Optional[Literal["day", "month", "year"]] = Field(default=None, description="Time range for the search")
+
+class BatchSearchResult(SearchResults):
+    """Results of a single query of a batch search"""
+    error: Optional[str] = Field(default=None, description="Error message if the query failed")
+
+class BatchSearchResults(BaseModel):
+    """Results of a batch search, in the order of the queries"""
+    searches: List[BatchSearchResult] = Field(description="Per-query results")
+    total_queries: int = Field(description="The number of queries executed")
+    failed_queries: int = Field(description="The number of queries that failed")
+
+def _to_wire(hits: List[SearchHit]) -> List[SearchResult]:
+    """Convert search hits to output models without re-validating them"""
+    return [
+        SearchResult.model_construct(title=hit.title, url=hit.url, content=hit.content)
+        for hit in hits
+    ]
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated parameter into a list"""
+    return [v.strip() for v in value.split(",")] if value else None
 
 @mcp.tool()
 async def search(
@@ -37,47 +115,115 @@ async def search(
     engines: Optional[str] = None,
     categories: Optional[str] = None,
     time_range: Optional[Literal["day", "month", "year"]] = None,
+    refresh: bool = False,
+    fanout: bool = False,
+    deadline: Optional[float] = None,
     ctx: Optional[Context] = None
 ) -> SearchResults:
-    """Search the web using SearXNG."""
+    """Search the web using SearXNG. Set refresh to bypass cached results.
 
-    searx_host = os.getenv("SEARX_HOST", "http://localhost:8888")
+    With fanout, each engine is queried separately (first result page only) so
+    one slow engine does not hold up the others. deadline (seconds) bounds the whole search: results
+    gathered so far are returned and engines that did not make it are listed;
+    if nothing arrived in time, the search fails with a timeout error.
+    """
+
+    with trace("mcp.search", query=query):
+        searx_host = os.getenv("SEARX_HOST", "http://localhost:8888")
       
-    # Log the search query
-    if ctx:
-        await ctx.info(f"Searching for: {query} with {searx_host}")
-        await ctx.report_progress(progress=0.2, message="Starting search...")
+        # Log the search query
+        if ctx:
+            await ctx.info(f"Searching for: {query} with {searx_host}")
+            await ctx.report_progress(progress=0.2, message="Starting search...")
     
-    # Parse engines and categories if provided
-    engines_list = [e.strip() for e in engines.split(",")] if engines else None
-    categories_list = [c.strip() for c in categories.split(",")] if categories else None
-    
-    # Perform the search
-    if ctx:
-        await ctx.report_progress(progress=0.5, message="Querying SearxNG...")
-
-    results = await searx_search(
-        searx_host=searx_host,
-        query=query,
-        num_results=num_results,
-        engines=engines_list,
-        categories=categories_list,
-        time_range=time_range,
-    )
+        # Parse engines and categories if provided
+        engines_list = _split(engines)
+        categories_list = _split(categories)
     
-    if ctx:
-        await ctx.report_progress(progress=1.0, message=f"Search complete, found {len(results)} results")
+        # Perform the search
+        if ctx:
+            await ctx.report_progress(progress=0.5, message="Querying SearxNG...")
+
+        async with search_admission.slot():
+            results = await searx_search(
+                searx_host=searx_host,
+                query=query,
+                num_results=num_results,
+                engines=engines_list,
+                categories=categories_list,
+                time_range=time_range,
+                refresh=refresh,
+                fanout=fanout,
+                deadline=deadline,
+            )
     
-    # Convert to structured output
-    search_results = [
-        SearchResult(title=r["title"], url=r["url"], content=r["content"])
-        for r in results
-    ]
+        if ctx:
+            await ctx.report_progress(progress=1.0, message=f"Search complete, found {len(results)} results")
     
-    return SearchResults(
-        results=search_results,
-        query=query,
-        total_results=len(search_results)
+        # Convert to structured output
+        with span("convert", results=len(results)):
+            search_results = _to_wire(results)
+            return SearchResults(
+                results=search_results,
+                query=query,
+                total_results=len(search_results),
+                dropped_engines=results.dropped_engines,
+                partial=results.partial,
+            )
+
+@mcp.tool()
+async def search_batch(
+    queries: List[SearchQuery],
+    max_concurrency: Optional[int] = None,
+    refresh: bool = False,
+    ctx: Optional[Context] = None
+) -> BatchSearchResults:
+    """Run several web searches through SearXNG concurrently and return all results at once."""
+
+    searx_host = os.getenv("SEARX_HOST", "http://localhost:8888")
+    limit = max_concurrency or int(os.getenv("SEARX_BATCH_CONCURRENCY", "8"))
+    semaphore = asyncio.Semaphore(max(1, limit))
+    done = 0
+
+    if ctx:
+        await ctx.info(f"Running {len(queries)} searches with {searx_host}")
+
+    async def run(spec: SearchQuery) -> BatchSearchResult:
+        nonlocal done
+        async with semaphore:
+            try:
+                async with search_admission.slot():
+                    results = await searx_search(
+                        searx_host=searx_host,
+                        query=spec.query,
+                        num_results=spec.num_results,
+                        engines=_split(spec.engines),
+                        categories=_split(spec.categories),
+                        time_range=spec.time_range,
+                        refresh=refresh,
+                        raise_errors=True,
+                    )
+                error = None
+            except Exception as e:
+                results, error = ResultList(), str(e) or type(e).__name__
+        done += 1
+        if ctx:
+            await ctx.report_progress(progress=done, total=len(queries), message=f"Completed: {spec.query}")
+        search_results = _to_wire(results)
+        return BatchSearchResult(
+            results=search_results,
+            query=spec.query,
+            total_results=len(search_results),
+            dropped_engines=results.dropped_engines,
+            partial=results.partial,
+            error=error,
+        )
+
+    searches = await asyncio.gather(*(run(spec) for spec in queries))
+    return BatchSearchResults(
+        searches=searches,
+        total_queries=len(searches),
+        failed_queries=sum(1 for s in searches if s.error),
     )
 
 @mcp.resource("searx-categories://")
@@ -98,6 +244,69 @@ def get_engines() -> str:
         result.append("")
     return "\n".join(result)
 
+@mcp.resource("searx-breakers://")
+def get_breakers() -> str:
+    """Get the circuit breaker state of SearxNG hosts and their upstream engines"""
+    from .breaker import engine_breakers, host_states
+    result = ["## Hosts"]
+    for host in host_states():
+        result.append(
+            f"- {host['host']}: {host['state']}, {host['consecutive_failures']} consecutive failures"
+            + (f", retry in {host['retry_in_s']} s" if host["retry_in_s"] else "")
+        )
+    result.append("")
+    result.append("## Engines")
+    for engine in engine_breakers.stats():
+        result.append(
+            f"- {engine['engine']} on {engine['host']}: {engine['state']}, "
+            f"{engine['consecutive_failures']} consecutive failures"
+            + (f" ({engine['reason']})" if engine["reason"] else "")
+            + (f", retry in {engine['retry_in_s']} s" if engine["retry_in_s"] else "")
+        )
+    return "\n".join(result) if len(result) > 3 else "No requests made yet"
+
+@mcp.resource("searx-hosts://")
+def get_hosts() -> str:
+    """Get routing statistics of the configured SearxNG hosts"""
+    from .hosts import all_pools
+    from .hedge import all_hedgers
+    from .ratelimit import all_limiters
+    result = []
+    for pool in all_pools():
+        for host in pool.stats():
+            status = "ejected" if host["ejected"] else "healthy"
+            result.append(
+                f"- {host['url']}: {status}, ewma {host['ewma_ms']} ms, "
+                f"in flight {host['in_flight']}, requests {host['requests']}, failures {host['failures']}"
+            )
+    limiters = [limiter.stats() for limiter in all_limiters()]
+    if limiters:
+        result.append("\nRate limits:")
+    for limiter in limiters:
+        rate = "not paced" if limiter["rate"] is None else f"{limiter['rate']} req/s"
+        result.append(
+            f"- {limiter['url']}: {rate}, queued {limiter['queued']} "
+            f"(max {limiter['max_queued']}), throttled {limiter['throttled']}, rejected {limiter['rejected']}, "
+            f"waited {limiter['waited_s']} s, blocked for {limiter['blocked_s']} s"
+        )
+    hedgers = [hedger.stats() for hedger in all_hedgers()]
+    if hedgers:
+        result.append("\nHedging:")
+    for hedger in hedgers:
+        delay = "warming up" if hedger["delay_ms"] is None else f"hedge after {hedger['delay_ms']} ms"
+        result.append(
+            f"- {hedger['url']}: {delay}, requests {hedger['requests']}, hedged {hedger['hedged']}, "
+            f"hedge wins {hedger['hedge_wins']}, over budget {hedger['denied']}"
+        )
+    return "\n".join(result) or "No requests made yet"
+
+@mcp.resource("searx-stats://")
+def get_stats() -> str:
+    """Get server metrics: latency histograms, request and error counters, cache and pool usage"""
+    if WORKER_ID is not None and STATS_DIR:
+        return json.dumps(aggregate(STATS_DIR, metrics, WORKER_ID).snapshot(), indent=2)
+    return json.dumps(metrics.snapshot(), indent=2)
+
 @mcp.resource("searx-info://")
 def get_info() -> str:
     """Get information about SearXNG and how to use it"""
@@ -107,10 +316,12 @@ SearXNG is a privacy-respecting, hackable metasearch engine. It aggregates resul
 
 ## How to use this MCP server
 
-1. Use the `search` tool to perform web searches through SearXNG
+1. Use the `search` tool to perform web searches through SearXNG, or `search_batch` to run several related searches in one call
 2. Customize your search with engines and categories parameters
 3. Browse available categories with the `searx-categories://` resource
-4. Browse common engines with the `searx-engines://` resource
+4. Browse common engines with the `searx-engines://` resource, and see which ones are currently switched off by their circuit breaker with `searx-breakers://`
+5. Check the health of the configured SearxNG hosts with the `searx-hosts://` resource
+6. Inspect latency, error and cache metrics of this server with the `searx-stats://` resource
 
 ## Examples
 
@@ -119,6 +330,8 @@ SearXNG is a privacy-respecting, hackable metasearch engine. It aggregates resul
 - Search news only: `search(query="latest developments", categories="news")`
 - Search recent results: `search(query="breaking news", time_range="day")`
 - Search monthly trends: `search(query="market analysis", time_range="month")`
+- Query engines in parallel with a deadline: `search(query="python asyncio", engines="google,bing,duckduckgo", fanout=True, deadline=2)`
+- Several searches at once: `search_batch(queries=[{"query": "rust async"}, {"query": "tokio tutorial", "engines": "github"}])`
 
 ## Note
 
@@ -133,9 +346,105 @@ Use the search tool to look for relevant information, and provide a summary of t
 You may want to try different search engines or categories if the initial results aren't helpful.
 """
 
+async def _serve_http(args: argparse.Namespace, sock=None) -> None:
+    """Serve MCP over HTTP, sharing one pool, cache and rate limiter across clients"""
+    from .server import serve_http
+    if args.transport == "sse":
+        app, path = mcp.sse_app(), mcp.settings.sse_path
+    else:
+        app, path = mcp.streamable_http_app(), mcp.settings.streamable_http_path
+    async with shared_resources():
+        await serve_http(
+            app,
+            search_admission,
+            host=args.host,
+            port=args.port,
+            drain_timeout=args.drain_timeout,
+            log_level=mcp.settings.log_level.lower(),
+            path=path,
+            sock=sock,
+        )
+
+def _run_worker(args: argparse.Namespace, host: str, port: int, sock) -> None:
+    """Entry point of a worker process started by the supervisor"""
+    from .server import worker_socket
+    # a client's requests may reach different workers, so keep no session state
+    mcp.settings.stateless_http = True
+    search_admission.limit = args.max_in_flight
+    try:
+        asyncio.run(_serve_http(args, worker_socket(host, port, sock)))
+    except KeyboardInterrupt:
+        pass
+
+def parse_args() -> argparse.Namespace:
+    from .server import DRAIN_TIMEOUT, HOST, PORT, TRANSPORT, TRANSPORTS, WORKERS
+    parser = argparse.ArgumentParser(description="MCP server for SearXNG search")
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=TRANSPORT,
+        help="stdio for a server per client, or streamable-http/sse to serve many clients "
+             "from one process (default: $SEARX_MCP_TRANSPORT or stdio)"
+    )
+    parser.add_argument(
+        "--host",
+        default=HOST,
+        help="Listen address of the HTTP transports (default: $SEARX_MCP_HOST or 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=PORT,
+        help="Listen port of the HTTP transports (default: $SEARX_MCP_PORT or 8000)"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=MAX_IN_FLIGHT,
+        help="Maximum concurrent searches of the server, 0 for no limit (default: $SEARX_MAX_IN_FLIGHT or 64)"
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=DRAIN_TIMEOUT,
+        help="Seconds to let running searches finish on shutdown (default: $SEARX_DRAIN_TIMEOUT or 30)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="Worker processes serving the streamable-http transport, each with its own event loop, "
+             "restarted when they crash (default: $SEARX_WORKERS or 1)"
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and args.transport != "streamable-http":
+        parser.error("--workers requires the streamable-http transport")
+    return args
+
 def main():
-    # Run the MCP server using the default stdio transport
-    mcp.run()
+    args = parse_args()
+    search_admission.limit = args.max_in_flight
+    if args.transport == "stdio":
+        mcp.run()
+    elif args.workers > 1:
+        from .server import Supervisor
+        supervisor = Supervisor(
+            _run_worker,
+            (args,),
+            args.workers,
+            host=args.host,
+            port=args.port,
+            drain_timeout=args.drain_timeout,
+            metrics_file=METRICS_FILE,
+            metrics_interval=METRICS_INTERVAL,
+        )
+        raise SystemExit(supervisor.run())
+    else:
+        try:
+            asyncio.run(_serve_http(args))
+        except KeyboardInterrupt:
+            # uvicorn re-raises the signal once it has shut down gracefully
+            pass
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,357 @@
+"""
+Metrics
+
+Built-in instrumentation of searches and upstream SearXNG requests: latency
+histograms, request and error counters and in-flight gauges, plus the state of
+the result caches, host pools and the connection pool collected on demand. A
+snapshot is served by the ``searx-stats://`` MCP resource and can be rendered
+in the Prometheus text format, e.g. to a file picked up by node_exporter's
+textfile collector (``SEARX_METRICS_FILE``).
+
+Recording is a dict lookup and a bisect per observation, cheap enough to stay
+on in production. Metrics are updated from the event loop without locking.
+
+In multi-worker mode every worker publishes its raw metrics to a file in the
+stats directory; :func:`aggregate` merges them into one view with counters and
+histograms summed and gauges labelled by worker.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Prometheus text file written periodically by the MCP server, if set
+METRICS_FILE = os.getenv("SEARX_METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("SEARX_METRICS_INTERVAL", "15"))
+
+# Set by the worker supervisor (see searxng.server) in each worker process
+WORKER_ID = os.getenv("SEARX_WORKER_ID")
+STATS_DIR = os.getenv("SEARX_STATS_DIR")
+STATS_INTERVAL = 5.0
+
+# Latency buckets in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile q, or None when empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Registry of counters, histograms and gauges, keyed by name and labels."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.help: Dict[str, str] = {}
+        self.workers: List[str] = []
+        self._collectors: List[Callable[["Metrics"], None]] = []
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self.gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def add(self, name: str, delta: float, **labels: str) -> None:
+        series = self.gauges.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + delta
+
+    def set_total(self, name: str, value: float, **labels: str) -> None:
+        """Set a counter maintained elsewhere (e.g. cache hit counts)."""
+        self.counters.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def describe(self, name: str, text: str) -> None:
+        self.help[name] = text
+
+    def collector(self, fn: Callable[["Metrics"], None]) -> Callable[["Metrics"], None]:
+        """Register fn to refresh gauges right before a snapshot is taken."""
+        self._collectors.append(fn)
+        return fn
+
+    def collect(self) -> None:
+        for fn in self._collectors:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}", file=sys.stderr)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON friendly view of every metric, with p50/p95/p99 for histograms."""
+        self.collect()
+
+        def series(data: Dict[Labels, Any], render: Callable[[Any], Any]) -> List[Dict[str, Any]]:
+            return [{**dict(labels), "value": render(value)} for labels, value in sorted(data.items())]
+
+        def quantile(h: Histogram, q: float) -> Any:
+            value = h.quantile(q)
+            return f">{BUCKETS[-1]}" if value == float("inf") else value
+
+        def histogram(h: Histogram) -> Dict[str, Any]:
+            return {
+                "count": h.count,
+                "mean_ms": round(h.sum / h.count * 1000, 1) if h.count else None,
+                "p50_s": quantile(h, 0.5),
+                "p95_s": quantile(h, 0.95),
+                "p99_s": quantile(h, 0.99),
+            }
+
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            **({"workers": self.workers} if self.workers else {}),
+            "counters": {name: series(data, lambda v: v) for name, data in sorted(self.counters.items())},
+            "gauges": {name: series(data, lambda v: v) for name, data in sorted(self.gauges.items())},
+            "histograms": {name: series(data, histogram) for name, data in sorted(self.histograms.items())},
+        }
+
+    def prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        self.collect()
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, data in sorted(self.counters.items()):
+            header(name, "counter")
+            lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in sorted(data.items()))
+        for name, data in sorted(self.gauges.items()):
+            header(name, "gauge")
+            lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in sorted(data.items()))
+        for name, data in sorted(self.histograms.items()):
+            header(name, "histogram")
+            for labels, h in sorted(data.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float("inf"),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, text: Optional[str] = None) -> None:
+        """Atomically replace path with the current (or the given) Prometheus text."""
+        _write_atomic(path, self.prometheus() if text is None else text)
+
+    def export(self) -> Dict[str, Any]:
+        """Raw JSON friendly state, for merging with the metrics of other workers."""
+        self.collect()
+
+        def series(data: Dict[Labels, Any], render: Callable[[Any], Any]) -> Dict[str, List[Any]]:
+            return {name: [[dict(labels), render(value)] for labels, value in values.items()] for name, values in data.items()}
+
+        return {
+            "started": self.started,
+            "counters": series(self.counters, lambda v: v),
+            "gauges": series(self.gauges, lambda v: v),
+            "histograms": series(self.histograms, lambda h: [h.counts, h.sum, h.count]),
+        }
+
+    @classmethod
+    def merge(cls, exports: Dict[str, Dict[str, Any]]) -> "Metrics":
+        """Combine exports by worker: counters and histograms add up, gauges get a worker label."""
+        merged = cls()
+        merged.workers = sorted(exports)
+        for worker, data in sorted(exports.items()):
+            merged.started = min(merged.started, data["started"])
+            for name, values in data["counters"].items():
+                for labels, value in values:
+                    merged.inc(name, value, **labels)
+            for name, values in data["gauges"].items():
+                for labels, value in values:
+                    merged.set(name, value, **labels, worker=worker)
+            for name, values in data["histograms"].items():
+                for labels, (counts, total, count) in values:
+                    if len(counts) != len(BUCKETS) + 1:
+                        continue
+                    series = merged.histograms.setdefault(name, {})
+                    key = tuple(sorted(labels.items()))
+                    histogram = series.get(key)
+                    if histogram is None:
+                        histogram = series[key] = Histogram()
+                    histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                    histogram.sum += total
+                    histogram.count += count
+        return merged
+
+
+def _write_atomic(path: str, text: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def label_list(values: Optional[List[str]], default: str = "default") -> str:
+    """Stable label value of an engine or category selection."""
+    return ",".join(sorted(values)) if values else default
+
+
+async def dump_periodically(path: str, interval: float = 15.0) -> None:
+    """Write the Prometheus text file every interval seconds until cancelled."""
+    try:
+        while True:
+            # render on the loop that owns the metrics, write from a thread
+            await asyncio.to_thread(metrics.write_prometheus, path, metrics.prometheus())
+            await asyncio.sleep(interval)
+    finally:
+        metrics.write_prometheus(path)
+
+
+def _stats_path(directory: str, worker: str) -> str:
+    return os.path.join(directory, f"worker-{worker}.json")
+
+
+def load_exports(directory: str) -> Dict[str, Dict[str, Any]]:
+    """Read the metrics published by the workers in directory, keyed by worker."""
+    exports = {}
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return exports
+    for name in names:
+        if not (name.startswith("worker-") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                exports[name[len("worker-"):-len(".json")]] = json.load(f)
+        except (OSError, ValueError):
+            continue
+    return exports
+
+
+def aggregate(directory: str, local: Optional[Metrics] = None, worker: Optional[str] = None) -> Metrics:
+    """Metrics of all workers publishing to directory, using local's live state for worker."""
+    exports = load_exports(directory)
+    if local is not None and worker is not None:
+        exports[worker] = local.export()
+    merged = Metrics.merge(exports)
+    merged.help.update(metrics.help)
+    return merged
+
+
+async def publish_periodically(directory: str, worker: str, interval: float = STATS_INTERVAL) -> None:
+    """Publish this worker's metrics to directory every interval seconds until cancelled."""
+    path = _stats_path(directory, worker)
+    try:
+        while True:
+            text = json.dumps(metrics.export())
+            await asyncio.to_thread(_write_atomic, path, text)
+            await asyncio.sleep(interval)
+    finally:
+        _write_atomic(path, json.dumps(metrics.export()))
+
+
+def _collect_state(m: Metrics) -> None:
+    """Gauges of the caches, host pools, limiters and the connection pool."""
+    from .admission import search_admission
+    from .hedge import all_hedgers
+    from .hosts import all_pools
+    from .ratelimit import all_limiters
+    from .search import disk_cache, inflight, result_cache
+    from .session import pool_stats
+
+    cache = result_cache.stats()
+    for result in ("hits", "stale_hits", "negative_hits", "misses"):
+        m.set_total("searx_cache_lookups_total", cache[result], cache="memory", result=result)
+    m.set("searx_cache_hit_ratio", round(cache["hit_ratio"], 4), cache="memory")
+    m.set("searx_cache_entries", cache["entries"], cache="memory")
+    m.set("searx_cache_bytes", cache["bytes"], cache="memory")
+    if disk_cache is not None:
+        disk = disk_cache.stats()
+        for result in ("hits", "misses"):
+            m.set_total("searx_cache_lookups_total", disk[result], cache="disk", result=result)
+
+    coalesced = inflight.stats()
+    m.set("searx_singleflight_in_flight", coalesced["in_flight"])
+    m.set_total("searx_singleflight_coalesced_total", coalesced["coalesced"])
+    m.set_total("searx_singleflight_rejoined_total", coalesced["rejoined"])
+
+    for pool in all_pools():
+        for host in pool.stats():
+            m.set("searx_host_in_flight", host["in_flight"], host=host["url"])
+            m.set("searx_host_ewma_seconds", round(host["ewma_ms"] / 1000, 4), host=host["url"])
+            m.set("searx_host_ejected", int(host["ejected"]), host=host["url"])
+    for limiter in all_limiters():
+        stats = limiter.stats()
+        if stats["rate"] is not None:
+            m.set("searx_ratelimit_rate", stats["rate"], host=stats["url"])
+        m.set("searx_ratelimit_queued", stats["queued"], host=stats["url"])
+        m.set_total("searx_ratelimit_throttled_total", stats["throttled"], host=stats["url"])
+    for hedger in all_hedgers():
+        stats = hedger.stats()
+        m.set_total("searx_hedges_total", stats["hedged"], host=stats["url"])
+        m.set_total("searx_hedge_wins_total", stats["hedge_wins"], host=stats["url"])
+
+    admission = search_admission.stats()
+    m.set("searx_admission_in_flight", admission["in_flight"])
+    m.set("searx_admission_queued", admission["queued"])
+    m.set_total("searx_admission_rejected_total", admission["rejected"])
+
+    for name, value in pool_stats().items():
+        m.set(f"searx_connections_{name}", value)
+
+
+metrics = Metrics()
+metrics.collector(_collect_state)
+metrics.describe("searx_search_duration_seconds", "Duration of searx_search calls by result source")
+metrics.describe("searx_request_duration_seconds", "Duration of successful SearXNG requests")
+metrics.describe("searx_requests_total", "SearXNG requests by host and outcome")
+metrics.describe("searx_errors_total", "Errors by class")
+metrics.describe("searx_searches_in_flight", "searx_search calls in progress")
@@ -0,0 +1,227 @@
+"""
+Per-host Rate Limiting
+
+SearXNG instances run a bot-detection limiter that answers bursts with 429 (or
+503) responses and may ban the client for a while. This module keeps a token
+bucket per host so we pace ourselves once the instance asks us to. The bucket
+rate adapts AIMD-style: it grows additively while requests succeed and is cut
+multiplicatively on every throttling response, honouring ``Retry-After``.
+Requests over the rate queue for a bounded time instead of hammering the host.
+
+Many instances (e.g. self-hosted ones) have no limiter at all, so by default a
+host is not paced until it first throttles us; pacing then starts at half the
+rate we were sending at. SEARX_RATE_LIMIT sets a fixed starting rate instead.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+# Limiter settings, overridable through the environment; without SEARX_RATE_LIMIT
+# hosts are paced only after their first throttling response, 0 disables pacing
+RATE_LIMIT: Optional[float] = float(os.environ["SEARX_RATE_LIMIT"]) if os.getenv("SEARX_RATE_LIMIT") else None
+RATE_BURST = float(os.getenv("SEARX_RATE_BURST", "10"))
+RATE_MAX_WAIT = float(os.getenv("SEARX_RATE_MAX_WAIT", "5"))
+
+# Minimum seconds between two rate decreases
+DECREASE_INTERVAL = 1.0
+
+# HTTP statuses SearXNG's limiter answers with
+THROTTLE_STATUSES = (429, 503)
+
+
+class RateLimitExceeded(Exception):
+    """A request would have to queue longer than allowed for a token."""
+
+    def __init__(self, url: str, wait: float):
+        super().__init__(f"Rate limit of {url} would delay the request by {wait:.1f}s")
+        self.url = url
+        self.wait = wait
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Adaptive token bucket of a single SearXNG host.
+
+    Tokens refill at ``rate`` per second up to ``burst``. With ``rate`` None the
+    host is not paced until the first :meth:`throttle`, which starts pacing at
+    the rate requests were sent in the last second, cut by ``decrease``. A request takes a token,
+    reserving a future one when the bucket is empty, so queued requests are
+    released in arrival order at the current rate. A request whose wait would
+    exceed ``max_wait`` (or the caller's timeout) is rejected instead.
+
+    Async requests wait with :meth:`acquire`, sync ones (possibly from several
+    threads) with :meth:`wait`; both draw from the same bucket.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        rate: Optional[float] = 10.0,
+        burst: float = 10.0,
+        max_wait: float = 5.0,
+        min_rate: float = 0.2,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+    ):
+        self.url = url
+        self.rate = rate
+        self.max_rate = rate if rate is not None else float("inf")
+        self.min_rate = min(min_rate, self.max_rate)
+        self.burst = max(burst, 1.0)
+        self.max_wait = max_wait
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.queued = 0
+        self.max_queued = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.waited = 0.0
+        # requests sent in the current and the previous second while unpaced
+        self._second = 0
+        self._sent = 0
+        self._sent_before = 0
+        self._decreased_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _roll(self, now: float) -> None:
+        second = int(now)
+        if second != self._second:
+            self._sent_before = self._sent if second == self._second + 1 else 0
+            self._second, self._sent = second, 0
+
+    def _reserve(self, timeout: Optional[float]) -> float:
+        """Take a token and return the wait until it is due; queues the caller if positive."""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                self._roll(now)
+                self._sent += 1
+                return 0.0
+            self._refill(now)
+            wait = max(0.0, (1 - self.tokens) / self.rate, self.blocked_until - now)
+            limit = self.max_wait if timeout is None else min(self.max_wait, timeout)
+            if wait > limit:
+                self.rejected += 1
+                raise RateLimitExceeded(self.url, wait)
+            self.tokens -= 1
+            if wait > 0:
+                self.queued += 1
+                self.max_queued = max(self.max_queued, self.queued)
+            return wait
+
+    def _dequeue(self, wait: float, refund: bool = False) -> None:
+        with self._lock:
+            self.queued -= 1
+            if refund:
+                # hand the reserved token back to the requests queued behind
+                self.tokens += 1
+            else:
+                self.waited += wait
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """Wait for a token and return the time spent waiting.
+
+        Raises RateLimitExceeded without taking a token when the wait would
+        exceed max_wait or timeout.
+        """
+        wait = self._reserve(timeout)
+        if wait <= 0:
+            return 0.0
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._dequeue(wait, refund=True)
+            raise
+        self._dequeue(wait)
+        return wait
+
+    def wait(self, timeout: Optional[float] = None) -> float:
+        """Blocking :meth:`acquire` for sync callers."""
+        wait = self._reserve(timeout)
+        if wait <= 0:
+            return 0.0
+        try:
+            time.sleep(wait)
+        finally:
+            self._dequeue(wait)
+        return wait
+
+    def success(self) -> None:
+        """Additive increase after a request that was not throttled."""
+        if self.rate is None:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease after a 429/503, pausing for Retry-After if given."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            if self.rate is None:
+                # start pacing below the rate that got us throttled
+                self._roll(now)
+                self.rate = float(max(self._sent, self._sent_before))
+                self.updated = now
+            self._refill(now)
+            # the requests in flight when the host started throttling answer
+            # together; cut the rate once for them
+            if now - self._decreased_at >= DECREASE_INTERVAL:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._decreased_at = now
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "rate": round(self.rate, 2) if self.rate is not None else None,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "waited_s": round(self.waited, 3),
+            "blocked_s": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(url: str) -> Optional[RateLimiter]:
+    """Return the shared limiter of a host, or None if SEARX_RATE_LIMIT is 0."""
+    if RATE_LIMIT is not None and RATE_LIMIT <= 0:
+        return None
+    limiter = _limiters.get(url)
+    if limiter is None:
+        limiter = _limiters[url] = RateLimiter(url, RATE_LIMIT, RATE_BURST, RATE_MAX_WAIT)
+    return limiter
+
+
+def all_limiters() -> List[RateLimiter]:
+    return list(_limiters.values())
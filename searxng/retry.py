@@ -0,0 +1,60 @@
+"""
+Retry Policy
+
+Search requests are idempotent GETs, so failures that may clear up on their own
+(connection errors, timeouts, 5xx and throttling responses) are worth repeating
+before a search is reported as failed. Retries back off exponentially with full
+jitter, so concurrent searches do not retry in lockstep, and never outlast the
+deadline of the search.
+"""
+
+import os
+import random
+from typing import Optional
+
+from .client import SearxError, SearxRateLimitError
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient Searx errors.
+
+    ``retries`` is the number of additional rounds after the first one; delay
+    n (from 0) is drawn uniformly from ``[0, min(max_delay, base_delay * 2**n)]``,
+    but is never shorter than a ``Retry-After`` the host asked for.
+    """
+
+    def __init__(self, retries: int = 2, base_delay: float = 0.2, max_delay: float = 2.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Create a policy from SEARX_RETRIES / SEARX_RETRY_* variables."""
+        return cls(
+            retries=int(os.getenv("SEARX_RETRIES", "2")),
+            base_delay=float(os.getenv("SEARX_RETRY_BASE_DELAY", "0.2")),
+            max_delay=float(os.getenv("SEARX_RETRY_MAX_DELAY", "2")),
+        )
+
+    @staticmethod
+    def retryable(error: Optional[BaseException]) -> bool:
+        return isinstance(error, SearxError) and error.transient
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if isinstance(error, SearxRateLimitError) and error.retry_after:
+            delay = max(delay, error.retry_after)
+        return delay
+
+    def backoff(self, attempt: int, error: Optional[BaseException], remaining: Optional[float]) -> Optional[float]:
+        """Delay before retry round attempt (from 0), or None if error should be raised."""
+        if attempt >= self.retries or not self.retryable(error):
+            return None
+        delay = self.delay(attempt, error)
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+retry_policy = RetryPolicy.from_env()
@@ -4,9 +4,41 @@ SearXNG Search Functions
 This module provides async search functionality using SearXNG instances.
 """
 
+import asyncio
+import os
+import sqlite3
 import sys
-from typing import List, Dict, Optional, Literal
-from .searx_search import SearxSearchWrapper
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Literal, Tuple, Union
+
+from .breaker import SearxCircuitOpenError, engine_breakers
+from .diskcache import DiskCache
+from .hedge import HEDGE, get_hedger
+from .hosts import get_pool, parse_hosts
+from .metrics import label_list, metrics
+from .retry import retry_policy
+from .client import (
+    Deadline,
+    SearchHit,
+    SearxAPIError,
+    SearxClient,
+    SearxDecodeError,
+    SearxError,
+    SearxRateLimitError,
+    SearxTimeoutError,
+    Timeouts,
+    get_client,
+)
+from .tracing import add_span, span, trace
+
+# Upper bound of SearXNG result pages requested by a single search
+MAX_PAGES = int(os.getenv("SEARX_MAX_PAGES", "5"))
+
+# Default total time budget of a search in seconds (0 disables it)
+DEFAULT_DEADLINE = float(os.getenv("SEARX_TIMEOUT", "30")) or None
 
 # Common SearXNG categories
 CATEGORIES = [
@@ -48,55 +80,741 @@ ENGINES = {
     ]
 }
 
-async def searx_search(
+class ResultList(list):
+    """List of :class:`SearchHit` results that also records whether it is complete.
+
+    Engines are dropped when a fan-out search hits its deadline or an engine
+    request fails, or when their circuit breaker is open; timed_out is set when
+    the deadline cut the search short and truncated when a later result page
+    failed. Such results are partial and never cached.
+    """
+
+    def __init__(self, results=(), dropped_engines=(), timed_out: bool = False, truncated: bool = False):
+        super().__init__(results)
+        self.dropped_engines: List[str] = list(dropped_engines)
+        self.timed_out = timed_out
+        self.truncated = truncated
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.dropped_engines) or self.timed_out or self.truncated
+
+    def copy(self) -> "ResultList":
+        """Copy the list; the immutable hits themselves are shared."""
+        return ResultList(self, self.dropped_engines, self.timed_out, self.truncated)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """JSON friendly representation of the results."""
+        return [hit.to_dict() for hit in self]
+
+
+class ResultCache:
+    """In-memory TTL cache of search results with LRU eviction.
+
+    Entries are fresh for ``ttl`` seconds after being stored and may then be
+    served stale for another ``stale_ttl`` seconds while the caller refreshes
+    them. Empty results and hard upstream errors are cached as negative entries
+    for ``negative_ttl`` seconds, so a failing query is not hammered by retry
+    loops; a negative entry never replaces results that can still be served.
+    The cache is bounded both by entry count and by an approximate byte budget;
+    the least recently used entries are evicted first. All operations are
+    non-blocking and guarded by a lock, so the cache can be shared by every
+    coroutine (and thread) in the process.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        stale_ttl: float = 300,
+        negative_ttl: float = 30,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        # key -> (fresh until, servable until, size, hits or cached error)
+        self._entries: "OrderedDict[Tuple, Tuple[float, float, int, Union[Tuple[SearchHit, ...], _CachedError]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Create a cache configured from SEARX_CACHE_* environment variables."""
+        return cls(
+            ttl=float(os.getenv("SEARX_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("SEARX_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("SEARX_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            stale_ttl=float(os.getenv("SEARX_CACHE_STALE_TTL", "300")),
+            negative_ttl=float(os.getenv("SEARX_CACHE_NEGATIVE_TTL", "30")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def lookup(self, key: Tuple) -> Tuple[Optional[ResultList], bool]:
+        """Return (results, fresh) for key, or (None, False) on miss.
+
+        Stale results come back with fresh False; the cached error of a
+        negative entry is raised.
+        """
+        if not self.enabled:
+            return None, False
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None, False
+            expires, _, _, value = entry
+            self._entries.move_to_end(key)
+            fresh = expires > now
+            if isinstance(value, _CachedError):
+                self.negative_hits += 1
+                raise value.fresh()
+            if not value:
+                self.negative_hits += 1
+            elif fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return ResultList(value), fresh
+
+    def get(self, key: Tuple) -> Optional[ResultList]:
+        """Return a copy of the fresh cached results for key, or None on miss."""
+        results, fresh = self.lookup(key)
+        return results if fresh else None
+
+    def set(self, key: Tuple, results: List[SearchHit]) -> None:
+        """Store results under key, evicting LRU entries as needed.
+
+        Empty results are only kept for negative_ttl.
+        """
+        if not results:
+            self._store(key, (), self.negative_ttl, 0.0, 64)
+            return
+        self._store(key, tuple(results), self.ttl, self.stale_ttl, _results_size(results))
+
+    def set_error(self, key: Tuple, error: BaseException) -> None:
+        """Remember a hard upstream error of key for negative_ttl."""
+        self._store(key, _CachedError(error), self.negative_ttl, 0.0, 256)
+
+    def _store(self, key: Tuple, value: Any, ttl: float, stale_ttl: float, size: int) -> None:
+        if not self.enabled or ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                negative = not value or isinstance(value, _CachedError)
+                if negative and entry[1] > now and not isinstance(entry[3], _CachedError) and entry[3]:
+                    # keep serving the previous results rather than an error
+                    return
+                self._remove(key)
+            self._entries[key] = (now + ttl, now + ttl + stale_ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: Tuple) -> None:
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class _CachedError:
+    """Class, message and attributes of a cached error.
+
+    Every lookup raises a fresh instance, so concurrent callers never share one
+    exception's traceback and context.
+    """
+
+    __slots__ = ("type", "args", "attrs")
+
+    def __init__(self, error: BaseException):
+        self.type = type(error)
+        self.args = error.args
+        self.attrs = dict(vars(error))
+
+    def fresh(self) -> BaseException:
+        # bypass __init__, whose arguments differ between error classes
+        error = self.type.__new__(self.type, *self.args)
+        error.args = self.args
+        error.__dict__.update(self.attrs)
+        return error
+
+
+def _results_size(results: List[SearchHit]) -> int:
+    """Approximate memory footprint of a result list in bytes."""
+    size = 64
+    for hit in results:
+        size += 150 + len(hit.title) + len(hit.url) + len(hit.content) + len(hit.category)
+        size += sum(len(engine) for engine in hit.engines)
+    return size
+
+
+def _normalize_list(values: Optional[List[str]]) -> Tuple[str, ...]:
+    return tuple(sorted({v.strip().lower() for v in values or [] if v and v.strip()}))
+
+
+def cache_key(
     searx_host: str,
     query: str,
+    num_results: int,
+    engines: Optional[List[str]] = None,
+    categories: Optional[List[str]] = None,
+    time_range: Optional[str] = None,
+    fanout: bool = False,
+) -> Tuple:
+    """Build a normalized cache key for a search request."""
+    return (
+        searx_host.strip().rstrip("/").lower(),
+        " ".join(query.lower().split()),
+        num_results,
+        _normalize_list(engines),
+        _normalize_list(categories),
+        time_range or "",
+        fanout,
+    )
+
+
+class SingleFlight:
+    """Coalesce concurrent identical searches into one upstream request.
+
+    The first caller for a key starts the request as a separate task; callers
+    arriving while it is in flight await the same task. Waiters are shielded, so
+    a cancelled caller never cancels the request for the others.
+
+    The shared request runs under its leader's deadline. When that runs out
+    first (a timeout, or results cut short), a waiter with time left starts a
+    new request, or joins one another waiter started, instead of failing with
+    the leader.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self.rejoined = 0
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+
+    async def do(
+        self, key: Tuple, fn: Callable[[], Awaitable[ResultList]], timeout: Optional[float] = None
+    ) -> ResultList:
+        """Run fn for key, or join the identical call already in flight.
+
+        timeout bounds how long a joining caller waits; the shared request
+        keeps running for the other callers.
+        """
+        deadline = Deadline(timeout)
+        while True:
+            task = self._inflight.get(key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(fn())
+                self._inflight[key] = task
+                task.add_done_callback(lambda t: self._done(key, t))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+            try:
+                # the leader's own fn honours its deadline
+                results = await asyncio.wait_for(asyncio.shield(task), None if leader else deadline.remaining())
+            except asyncio.TimeoutError:
+                if not (task.done() and not task.cancelled() and task.exception() is not None):
+                    raise SearxTimeoutError("Search deadline exceeded", deadline=True) from None
+                error = task.exception()
+                if leader or not _leader_ran_out(error) or deadline.expired:
+                    raise error
+                self.rejoined += 1
+                continue
+            if leader or not results.timed_out or deadline.expired:
+                return results.copy()
+            self.rejoined += 1
+
+    def _done(self, key: Tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "rejoined": self.rejoined,
+            "in_flight": len(self._inflight),
+        }
+
+
+def _leader_ran_out(error: BaseException) -> bool:
+    """Whether a shared request failed only because its leader's deadline expired."""
+    return isinstance(error, SearxTimeoutError) and error.deadline
+
+
+# Process-wide result cache shared by all searx_search calls
+result_cache = ResultCache.from_env()
+
+# In-flight request deduplication shared by all searx_search calls
+inflight = SingleFlight()
+
+# Optional persistent cache shared between processes (SEARX_CACHE_DIR)
+disk_cache: Optional[DiskCache] = DiskCache.from_env()
+
+
+def configure_disk_cache(directory: Optional[str]) -> Optional[DiskCache]:
+    """Point the persistent result cache at directory, or disable it with None."""
+    global disk_cache
+    if disk_cache is not None:
+        disk_cache.close()
+    disk_cache = DiskCache.from_env(directory) if directory else None
+    return disk_cache
+
+
+async def searx_search(
+    searx_host: Union[str, List[str]],
+    query: str,
     num_results: int = 10,
     engines: Optional[List[str]] = [],
     categories: Optional[List[str]] = [],
-    time_range: Optional[Literal["day", "month", "year"]] = None
-) -> List[Dict[str, str]]:
+    time_range: Optional[Literal["day", "month", "year"]] = None,
+    refresh: bool = False,
+    raise_errors: bool = False,
+    fanout: bool = False,
+    deadline: Optional[float] = None,
+    timeouts: Optional[Timeouts] = None,
+    hedge: Optional[bool] = None,
+) -> ResultList:
     """
     Perform async search using SearXNG.
 
+    Results are served from the cache when possible. Expired entries still in
+    their grace period (SEARX_CACHE_STALE_TTL) are returned immediately and
+    refreshed in the background; empty results and hard upstream errors are
+    remembered for SEARX_CACHE_NEGATIVE_TTL.
+
     Args:
-        searx_host: SearXNG instance URL
+        searx_host: SearXNG instance URL, or several (list or comma-separated)
+            to balance over with failover
         query: Search query
         num_results: Number of results (default: 10)
         engines: Specific engines to use
         categories: Specific categories to search
         time_range: Time filter ('day', 'month', or 'year')
+        refresh: Skip the result cache and store a fresh result
+        raise_errors: Also propagate unexpected errors instead of returning an
+            empty list (SearxError is always propagated)
+        fanout: Query each engine with a separate concurrent request and merge
+            the results as they arrive; each engine returns its first result
+            page only, so num_results is capped by what those pages hold
+        deadline: Total time budget in seconds (default: SEARX_TIMEOUT), shared
+            by failover, pagination and fan-out. When it expires, results
+            gathered so far are returned as partial results; without any,
+            SearxTimeoutError is raised
+        timeouts: Per-request connect/first-byte/total timeouts overriding the
+            SEARX_*_TIMEOUT defaults
+        hedge: Send a duplicate request, to another host if available, when a
+            request is slower than usual (default: SEARX_HEDGE)
 
     Returns:
-        List of search results with title, url, and content
+        ResultList of SearchHit records (title, url, content, engines, category, score)
+
+    Raises:
+        SearxTimeoutError: If the deadline expired before any result arrived.
+        SearxRateLimitError: If every host throttled the search or their rate
+            limiters could not fit it in the deadline.
+        SearxConnectionError, SearxServerError: If every host kept failing
+            after the retries allowed by SEARX_RETRIES.
+        SearxAPIError, SearxDecodeError: If a host rejected the search or
+            answered with invalid JSON; these are not retried.
+    """
+    hosts = parse_hosts(searx_host)
+    budget = Deadline(deadline if deadline is not None else DEFAULT_DEADLINE)
+    hedge = HEDGE if hedge is None else hedge
+    key = cache_key(",".join(hosts), query, num_results, engines, categories, time_range, fanout)
+
+    async def fetch(deadline: Deadline) -> ResultList:
+        try:
+            if fanout and engines and len(engines) > 1:
+                results = await _fanout(
+                    hosts, query, num_results, engines, categories, time_range, deadline, timeouts, hedge
+                )
+            else:
+                results = await _search(
+                    hosts, query, num_results, engines, categories, time_range, deadline, timeouts, hedge
+                )
+        except SearxError as e:
+            if _negative_cacheable(e):
+                result_cache.set_error(key, e)
+            raise
+        if not results.partial:
+            result_cache.set(key, results)
+            if results and disk_cache is not None:
+                await _disk_cache_set(disk_cache, key, results)
+        return results
+
+    started = time.perf_counter()
+    source = "upstream"
+    metrics.add("searx_searches_in_flight", 1)
+    with trace("search", query=query, num_results=num_results, fanout=fanout) as current:
+        try:
+            if not refresh:
+                with span("cache"):
+                    cached, fresh = result_cache.lookup(key)
+                if cached is not None:
+                    source = "cache" if fresh else "stale"
+                    if not fresh:
+                        _revalidate(key, lambda: fetch(Deadline(DEFAULT_DEADLINE)))
+                    return cached
+                if disk_cache is not None:
+                    with span("disk_cache"):
+                        cached = await _disk_cache_get(disk_cache, key)
+                    if cached is not None:
+                        source = "disk"
+                        result_cache.set(key, cached)
+                        return ResultList(cached)
+
+            return await inflight.do(key, lambda: fetch(budget), timeout=budget.remaining())
+        except asyncio.CancelledError:
+            source = "cancelled"
+            raise
+        except Exception as e:
+            source = "error"
+            metrics.inc("searx_errors_total", **{"class": type(e).__name__})
+            if raise_errors or isinstance(e, SearxError):
+                raise
+            print(f"Search error: {e}", file=sys.stderr)
+            return ResultList()
+        finally:
+            metrics.add("searx_searches_in_flight", -1)
+            metrics.observe("searx_search_duration_seconds", time.perf_counter() - started, source=source)
+            if current is not None:
+                current.attrs["source"] = source
+
+
+async def _disk_cache_get(cache: DiskCache, key: Tuple) -> Optional[List[SearchHit]]:
+    """Read key from the persistent cache; a broken cache counts as a miss."""
+    try:
+        return await asyncio.to_thread(cache.get, key)
+    except (sqlite3.Error, OSError) as e:
+        metrics.inc("searx_errors_total", **{"class": type(e).__name__})
+        print(f"Disk cache error: {e}", file=sys.stderr)
+        return None
+
+
+async def _disk_cache_set(cache: DiskCache, key: Tuple, results: List[SearchHit]) -> None:
+    """Store results in the persistent cache; a broken cache must not fail the search."""
+    try:
+        await asyncio.to_thread(cache.set, key, results)
+    except (sqlite3.Error, OSError) as e:
+        metrics.inc("searx_errors_total", **{"class": type(e).__name__})
+        print(f"Disk cache error: {e}", file=sys.stderr)
+
+
+def _negative_cacheable(error: SearxError) -> bool:
+    """Hard upstream failures that a quick repeat of the query would hit again."""
+    if isinstance(error, (SearxRateLimitError, SearxCircuitOpenError)):
+        return False
+    return isinstance(error, (SearxAPIError, SearxDecodeError))
+
+
+# background refreshes of stale cache entries, one per key
+_revalidations: Dict[Tuple, asyncio.Task] = {}
+
+
+def _revalidate(key: Tuple, fetch: Callable[[], Awaitable[ResultList]]) -> None:
+    """Refresh a stale cache entry in the background unless already refreshing."""
+    if key in _revalidations:
+        return
+
+    def done(task: asyncio.Task) -> None:
+        _revalidations.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background refresh failed: {task.exception()}", file=sys.stderr)
+
+    task = _revalidations[key] = asyncio.ensure_future(inflight.do(key, fetch))
+    task.add_done_callback(done)
+
+
+async def _fanout(
+    hosts: List[str],
+    query: str,
+    num_results: int,
+    engines: List[str],
+    categories: Optional[List[str]],
+    time_range: Optional[str],
+    deadline: Deadline,
+    timeouts: Optional[Timeouts],
+    hedge: bool = False,
+) -> ResultList:
+    """Query every engine separately and merge results as they arrive.
+
+    Each engine contributes its first result page only, so a fan-out search
+    sends one request per engine rather than up to MAX_PAGES; failover and
+    retries apply per engine as for a single search. Results are ranked by
+    their summed SearXNG score, ties broken by how many engines returned them. When the deadline expires, engines still pending are
+    cancelled and reported as dropped, as are engines whose request failed.
     """
+    tasks = {
+        asyncio.ensure_future(
+            _search(
+                hosts, query, num_results, [engine], categories, time_range, deadline, timeouts, hedge, max_pages=1
+            )
+        ): engine
+        for engine in engines
+    }
+    pending = set(tasks)
+    merged: Dict[str, SearchHit] = {}
+    scores: Dict[str, float] = {}
+    engines_by_url: Dict[str, set] = {}
+    dropped: List[str] = []
+    errors: List[Exception] = []
     try:
-        searx = SearxSearchWrapper(
-            searx_host=searx_host,
-            engines=engines,
-            categories=categories
+        while pending and not deadline.expired:
+            done, pending = await asyncio.wait(
+                pending, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                try:
+                    results = task.result()
+                except Exception as e:
+                    dropped.append(tasks[task])
+                    errors.append(e)
+                    continue
+                for hit in results:
+                    if hit.url in merged:
+                        scores[hit.url] += hit.score
+                        engines_by_url[hit.url].update(hit.engines)
+                    else:
+                        merged[hit.url] = hit
+                        scores[hit.url] = hit.score
+                        engines_by_url[hit.url] = set(hit.engines)
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if len(errors) == len(engines):
+        raise errors[0]
+    dropped.extend(tasks[task] for task in pending)
+    if not merged and pending:
+        raise SearxTimeoutError(
+            f"Search deadline exceeded before any engine answered: {', '.join(dropped)}", deadline=True
         )
-        
-        search_params = {"query": query, "num_results": num_results}
-        if time_range:
-            search_params["time_range"] = time_range
-           
-        results = await searx.aresults(**search_params)
-        
-        # Handle empty result case
-        if len(results) == 0:
-            return []
-
-        return [
-            {
-                "title": r.get("title", ""),
-                "url": r.get("link", ""),
-                "content": r.get("snippet", ""),
-                "engines": r.get("engines", []),
-                "category": r.get("category", ""),
-            }
-            for r in results
-        ]
-    except Exception as e:
-        print(f"Search error: {e}", file=sys.stderr)
-        return []
+    ranked = sorted(merged, key=lambda url: (scores[url], len(engines_by_url[url])), reverse=True)
+    results = [
+        replace(merged[url], score=scores[url], engines=tuple(sorted(engines_by_url[url])))
+        if engines_by_url[url] != set(merged[url].engines) else merged[url]
+        for url in ranked[:num_results]
+    ]
+    return ResultList(results, dropped, timed_out=bool(pending))
+
+
+async def _search(
+    hosts: List[str],
+    query: str,
+    num_results: int,
+    engines: Optional[List[str]],
+    categories: Optional[List[str]],
+    time_range: Optional[str],
+    deadline: Deadline,
+    timeouts: Optional[Timeouts],
+    hedge: bool = False,
+    max_pages: int = MAX_PAGES,
+) -> ResultList:
+    """Query SearXNG without caching, failing over between hosts; errors are propagated.
+
+    Transient errors fail over to the next host. Once every host failed, the
+    round is retried after a jittered backoff, as long as the retry policy and
+    the deadline allow.
+    """
+    pool = get_pool(hosts)
+    tried = []
+    attempt = 0
+    last_error: Optional[BaseException] = None
+    while True:
+        host = pool.pick(exclude=tried)
+        if host is None:
+            delay = retry_policy.backoff(attempt, last_error, deadline.remaining())
+            if delay is None:
+                raise last_error
+            await asyncio.sleep(delay)
+            attempt += 1
+            tried = []
+            continue
+        deadline.check()
+        tried.append(host)
+        started = pool.start(host)
+        try:
+            # hedge to the next best host, or to the same one when it is alone
+            alternate = pool.alternate(host) if hedge else None
+            results = await _search_host(
+                host.url, query, num_results, engines, categories, time_range, deadline, timeouts,
+                hedge_host=(alternate.url if alternate else host.url) if hedge else None,
+                max_pages=max_pages,
+            )
+        except (SearxRateLimitError, SearxCircuitOpenError) as e:
+            # the host is healthy, but busy or without the engines: try the next one
+            pool.release(host)
+            last_error = e
+            continue
+        except SearxError as e:
+            if not e.transient:
+                pool.release(host)
+                raise
+            if isinstance(e, SearxTimeoutError) and e.deadline:
+                # the caller ran out of time, the host is not to blame
+                pool.release(host)
+            else:
+                pool.failure(host)
+            last_error = e
+            continue
+        except BaseException:
+            pool.release(host)
+            raise
+        pool.success(host, started)
+        return results
+
+
+async def _search_host(
+    searx_host: str,
+    query: str,
+    num_results: int,
+    engines: Optional[List[str]],
+    categories: Optional[List[str]],
+    time_range: Optional[str],
+    deadline: Deadline,
+    timeouts: Optional[Timeouts],
+    hedge_host: Optional[str] = None,
+    max_pages: int = MAX_PAGES,
+) -> ResultList:
+    """Query a single SearXNG host, fetching as many pages as num_results needs.
+
+    The first page tells how many results a page holds; the remaining pages are
+    then requested concurrently (up to max_pages in total) and merged in rank
+    order, dropping duplicate URLs. Pagination stops at the first empty page or
+    once enough unique results are collected. Pages still missing when the
+    deadline expires are given up and the result is marked as timed out.
+    With hedge_host, each page request slower than usual is duplicated there.
+
+    Engines whose circuit breaker is open are left out of the request and
+    reported as dropped; every response feeds its unresponsive engines back
+    into the breakers.
+    """
+    client = get_client(searx_host, timeouts)
+    hedge_client = get_client(hedge_host, timeouts) if hedge_host else None
+
+    allowed, skipped = engine_breakers.split(searx_host, engines)
+    if skipped and not allowed:
+        raise SearxCircuitOpenError(searx_host, skipped)
+    requested = allowed or engines
+    engines_label, categories_label = label_list(requested), label_list(categories)
+    search_params: Dict[str, Any] = {"engines": requested, "categories": categories}
+    if time_range:
+        search_params["time_range"] = time_range
+
+    async def fetch(pageno: int) -> List[SearchHit]:
+        async def request(c: SearxClient) -> List[SearchHit]:
+            params = c.build_params(query, **search_params, pageno=pageno)
+            started = time.perf_counter()
+            try:
+                response = await c.aquery(params, deadline.remaining())
+            except SearxError as e:
+                metrics.inc("searx_requests_total", host=c.searx_host, outcome=type(e).__name__)
+                # a lone engine that times out the whole request is to blame,
+                # unless the caller's deadline was shorter than the request timeout
+                if isinstance(e, SearxTimeoutError) and not e.deadline and requested and len(requested) == 1:
+                    engine_breakers.failure(c.searx_host, requested, "timeout")
+                raise
+            metrics.inc("searx_requests_total", host=c.searx_host, outcome="ok")
+            metrics.observe(
+                "searx_request_duration_seconds",
+                time.perf_counter() - started,
+                host=c.searx_host,
+                engines=engines_label,
+                categories=categories_label,
+            )
+            hits = response.hits
+            engine_breakers.record(
+                c.searx_host, requested, response.unresponsive_engines, {e for hit in hits for e in hit.engines}
+            )
+            return [hit for hit in hits if hit.url][:num_results]
+
+        if hedge_client is None:
+            return await request(client)
+        return await get_hedger(searx_host).run(lambda: request(client), lambda: request(hedge_client))
+
+    first = await fetch(1)
+    merged: Dict[str, SearchHit] = {}
+    _merge_page(merged, first)
+    if len(merged) >= num_results or not first or max_pages <= 1:
+        return ResultList(list(merged.values())[:num_results], skipped)
+
+    needed = -(-(num_results - len(merged)) // len(first))
+    tasks = [asyncio.ensure_future(fetch(pageno)) for pageno in range(2, 2 + min(needed, max_pages - 1))]
+    timed_out = truncated = False
+    try:
+        for pageno, task in enumerate(tasks, 2):
+            try:
+                page = await task
+            except SearxTimeoutError:
+                timed_out = True
+                break
+            except Exception as e:
+                # extra pages are best effort once the first page succeeded,
+                # but the shortened result must not be cached as complete
+                metrics.inc("searx_errors_total", **{"class": type(e).__name__})
+                now = time.perf_counter()
+                add_span("page_error", now, now, pageno=pageno, error=type(e).__name__)
+                truncated = True
+                break
+            if not page:
+                break
+            _merge_page(merged, page)
+            if len(merged) >= num_results:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return ResultList(list(merged.values())[:num_results], skipped, timed_out=timed_out, truncated=truncated)
+
+
+def _merge_page(merged: Dict[str, SearchHit], page: List[SearchHit]) -> None:
+    """Append the hits of a page to merged (keyed by URL), skipping duplicates."""
+    for hit in page:
+        if hit.url not in merged:
+            merged[hit.url] = hit
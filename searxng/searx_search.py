@@ -106,6 +106,18 @@ engines.
 The resulting query will be the concatenation of the two with the former taking
 precedence.
 
+Concurrency
+-----------
+
+The sync methods share a pooled ``requests`` session and can be called from
+several threads; pass ``session`` to use your own. To run a list of queries
+concurrently use :meth:`results_many() <SearxSearchWrapper.results_many>`, or
+:meth:`aresults_many() <SearxSearchWrapper.aresults_many>` from async code.
+
+    .. code-block:: python
+
+        s.results_many(["python", "rust", "go"], num_results=5)
+
 
 See `SearxNG Configured Engines
 <https://docs.searxng.org/admin/engines/configured_engines.html>`_ and
@@ -128,11 +140,11 @@ own network as described
 For a list of public SearxNG instances see https://searx.space/
 """
 
-import json
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
-import aiohttp
-import requests
 from pydantic import (
     BaseModel,
     ConfigDict,
@@ -141,38 +153,32 @@ from pydantic import (
     model_validator,
 )
 
+from .client import (  # noqa: F401 - re-exported, this module was their home
+    RESULT_FIELDS,
+    Deadline,
+    SearchHit,
+    SearxAPIError,
+    SearxClient,
+    SearxConnectionError,
+    SearxDecodeError,
+    SearxError,
+    SearxRateLimitError,
+    SearxResults,
+    SearxServerError,
+    SearxTimeoutError,
+    Timeouts,
+    _get_default_params,
+    _normalize_host,
+    build_params,
+    get_client,
+)
+from .retry import retry_policy
+from .session import POOL_LIMIT_PER_HOST
 
-def _get_default_params() -> dict:
-    return {"language": "en", "format": "json", "categories": ["web"], }
-
-
-class SearxResults(dict):
-    """Dict like wrapper around search api results."""
-
-    _data: str = ""
-
-    def __init__(self, data: str):
-        """Take a raw result from Searx and make it into a dict like object."""
-        json_data = json.loads(data)
-        super().__init__(json_data)
-        self.__dict__ = self
-
-    def __str__(self) -> str:
-        """Text representation of searx result."""
-        return self._data
-
-    @property
-    def results(self) -> Any:
-        """Silence mypy for accessing this field.
-
-        :meta private:
-        """
-        return self.get("results")
-
-    @property
-    def answers(self) -> Any:
-        """Helper accessor on the json result."""
-        return self.get("answers")
+# Fields handed to the wrapper's SearxClient; assigning one rebuilds the client
+_CLIENT_FIELDS = frozenset(
+    {"searx_host", "params", "headers", "query_suffix", "unsecure", "timeouts", "aiosession", "session"}
+)
 
 
 class SearxSearchWrapper(BaseModel):
@@ -203,7 +209,7 @@ class SearxSearchWrapper(BaseModel):
 
     """
 
-    _result: SearxResults = PrivateAttr()
+    _client: SearxClient = PrivateAttr()
     searx_host: str = ""
     unsecure: bool = False
     params: dict = Field(default_factory=_get_default_params)
@@ -213,6 +219,8 @@ class SearxSearchWrapper(BaseModel):
     query_suffix: Optional[str] = ""
     k: int = 10
     aiosession: Optional[Any] = None
+    session: Optional[Any] = None
+    timeouts: Timeouts = Field(default_factory=Timeouts.from_env)
 
     @model_validator(mode="before")
     @classmethod
@@ -230,14 +238,8 @@ class SearxSearchWrapper(BaseModel):
         if categories:
             values["params"]["categories"] = ",".join(categories)
 
-        searx_host: str = values.get("searx_host")      ### use parameter only
-        if not searx_host.startswith("http"):
-            print(  # noqa: T201
-                f"Warning: missing the url scheme on host \
-                ! assuming secure https://{searx_host} "
-            )
-            searx_host = "https://" + searx_host
-        elif searx_host.startswith("http://"):
+        searx_host, plain_http = _normalize_host(values.get("searx_host"))      ### use parameter only
+        if plain_http:
             values["unsecure"] = True
         values["searx_host"] = searx_host
 
@@ -247,48 +249,66 @@ class SearxSearchWrapper(BaseModel):
         extra="forbid",
     )
 
-    def _searx_api_query(self, params: dict) -> SearxResults:
-        """Actual request to searx API."""
-        raw_result = requests.get(
+    def model_post_init(self, __context: Any) -> None:
+        self._client = self._make_client()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # callers may swap the host, sessions etc. after construction
+        if name in _CLIENT_FIELDS:
+            self._client = self._make_client()
+
+    def _make_client(self) -> SearxClient:
+        # params and host are already validated, so hand them over as they are
+        return SearxClient(
             self.searx_host,
+            params=self.params,
             headers=self.headers,
-            params=params,
-            verify=not self.unsecure,
+            query_suffix=self.query_suffix,
+            unsecure=self.unsecure,
+            timeouts=self.timeouts,
+            aiosession=self.aiosession,
+            session=self.session,
+            normalize=False,
         )
-        # test if http result is ok
-        if not raw_result.ok:
-            raise ValueError("Searx API returned an error: ", raw_result.text)
-        res = SearxResults(raw_result.text)
-        self._result = res
-        return res
-
-    async def _asearx_api_query(self, params: dict) -> SearxResults:
-        if not self.aiosession:
-            async with aiohttp.ClientSession() as session:
-                kwargs: Dict = {
-                    "headers": self.headers,
-                    "params": params,
-                }
-                if self.unsecure:
-                    kwargs["ssl"] = False
-                async with session.get(self.searx_host, **kwargs) as response:
-                    if not response.ok:
-                        raise ValueError("Searx API returned an error: ", response.text)
-                    result = SearxResults(await response.text())
-                    self._result = result
-        else:
-            async with self.aiosession.get(
-                self.searx_host,
-                headers=self.headers,
-                params=params,
-                verify=not self.unsecure,
-            ) as response:
-                if not response.ok:
-                    raise ValueError("Searx API returned an error: ", response.text)
-                result = SearxResults(await response.text())
-                self._result = result
-
-        return result
+
+    def _build_params(
+        self,
+        query: str,
+        engines: Optional[List[str]],
+        categories: Optional[List[str]],
+        query_suffix: Optional[str],
+        kwargs: dict,
+    ) -> dict:
+        return build_params(self.params, query, engines, categories, (self.query_suffix, query_suffix), kwargs)
+
+    def _searx_api_query(self, params: dict, timeout: Optional[float] = None) -> SearxResults:
+        """Actual request to searx API, retrying transient errors within timeout."""
+        deadline = Deadline(timeout)
+        attempt = 0
+        while True:
+            try:
+                return self._client.query(params, deadline.remaining())
+            except SearxError as e:
+                delay = retry_policy.backoff(attempt, e, deadline.remaining())
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def _asearx_api_query(self, params: dict, timeout: Optional[float] = None) -> SearxResults:
+        """Actual async request to searx API over a pooled session, retrying like the sync one."""
+        deadline = Deadline(timeout)
+        attempt = 0
+        while True:
+            try:
+                return await self._client.aquery(params, deadline.remaining())
+            except SearxError as e:
+                delay = retry_policy.backoff(attempt, e, deadline.remaining())
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
 
     def run(
         self,
@@ -296,6 +316,7 @@ class SearxSearchWrapper(BaseModel):
         engines: Optional[List[str]] = None,
         categories: Optional[List[str]] = None,
         query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
         **kwargs: Any,
     ) -> str:
         """Run query through Searx API and parse results.
@@ -307,6 +328,7 @@ class SearxSearchWrapper(BaseModel):
             query_suffix: Extra suffix appended to the query.
             engines: List of engines to use for the query.
             categories: List of categories to use for the query.
+            timeout: Overall time limit of the request in seconds.
             **kwargs: extra parameters to pass to the searx API.
 
         Returns:
@@ -329,24 +351,9 @@ class SearxSearchWrapper(BaseModel):
                 # to select the engine using `query_suffix`
                 searx.run("what is the weather in France ?", query_suffix="!qwant")
         """
-        _params = {
-            "q": query,
-        }
-        params = {**self.params, **_params, **kwargs}
-
-        if self.query_suffix and len(self.query_suffix) > 0:
-            params["q"] += " " + self.query_suffix
-
-        if isinstance(query_suffix, str) and len(query_suffix) > 0:
-            params["q"] += " " + query_suffix
+        params = self._build_params(query, engines, categories, query_suffix, kwargs)
 
-        if isinstance(engines, list) and len(engines) > 0:
-            params["engines"] = ",".join(engines)
-
-        if isinstance(categories, list) and len(categories) > 0:
-            params["categories"] = ",".join(categories)
-
-        res = self._searx_api_query(params)
+        res = self._searx_api_query(params, timeout)
 
         if len(res.answers) > 0:
             toret = res.answers[0]
@@ -364,24 +371,13 @@ class SearxSearchWrapper(BaseModel):
         query: str,
         engines: Optional[List[str]] = None,
         query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
         **kwargs: Any,
     ) -> str:
         """Asynchronously version of `run`."""
-        _params = {
-            "q": query,
-        }
-        params = {**self.params, **_params, **kwargs}
-
-        if self.query_suffix and len(self.query_suffix) > 0:
-            params["q"] += " " + self.query_suffix
+        params = self._build_params(query, engines, None, query_suffix, kwargs)
 
-        if isinstance(query_suffix, str) and len(query_suffix) > 0:
-            params["q"] += " " + query_suffix
-
-        if isinstance(engines, list) and len(engines) > 0:
-            params["engines"] = ",".join(engines)
-
-        res = await self._asearx_api_query(params)
+        res = await self._asearx_api_query(params, timeout)
 
         if len(res.answers) > 0:
             toret = res.answers[0]
@@ -401,6 +397,7 @@ class SearxSearchWrapper(BaseModel):
         engines: Optional[List[str]] = None,
         categories: Optional[List[str]] = None,
         query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
         **kwargs: Any,
     ) -> List[Dict]:
         """Run query through Searx API and returns the results with metadata.
@@ -411,6 +408,7 @@ class SearxSearchWrapper(BaseModel):
             num_results: Limit the number of results to return.
             engines: List of engines to use for the query.
             categories: List of categories to use for the query.
+            timeout: Overall time limit of the request in seconds.
             **kwargs: extra parameters to pass to the searx API.
 
         Returns:
@@ -421,22 +419,12 @@ class SearxSearchWrapper(BaseModel):
                 link: The link to the result.
                 engines: The engines used for the result.
                 category: Searx category of the result.
+                score: Searx relevance score of the result.
             }
 
         """
-        _params = {
-            "q": query,
-        }
-        params = {**self.params, **_params, **kwargs}
-        if self.query_suffix and len(self.query_suffix) > 0:
-            params["q"] += " " + self.query_suffix
-        if isinstance(query_suffix, str) and len(query_suffix) > 0:
-            params["q"] += " " + query_suffix
-        if isinstance(engines, list) and len(engines) > 0:
-            params["engines"] = ",".join(engines)
-        if isinstance(categories, list) and len(categories) > 0:
-            params["categories"] = ",".join(categories)
-        results = self._searx_api_query(params).results[:num_results]
+        params = self._build_params(query, engines, categories, query_suffix, kwargs)
+        results = self._searx_api_query(params, timeout).results[:num_results]
         if len(results) == 0:
             return [{"Result": "No good Search Result was found"}]
 
@@ -447,6 +435,7 @@ class SearxSearchWrapper(BaseModel):
                 "link": result["url"],
                 "engines": result["engines"],
                 "category": result["category"],
+                "score": result.get("score", 0.0),
             }
             for result in results
         ]
@@ -457,24 +446,15 @@ class SearxSearchWrapper(BaseModel):
         num_results: int,
         engines: Optional[List[str]] = None,
         query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
         **kwargs: Any,
     ) -> List[Dict]:
         """Asynchronously query with json results.
 
         Uses aiohttp. See `results` for more info.
         """
-        _params = {
-            "q": query,
-        }
-        params = {**self.params, **_params, **kwargs}
-
-        if self.query_suffix and len(self.query_suffix) > 0:
-            params["q"] += " " + self.query_suffix
-        if isinstance(query_suffix, str) and len(query_suffix) > 0:
-            params["q"] += " " + query_suffix
-        if isinstance(engines, list) and len(engines) > 0:
-            params["engines"] = ",".join(engines)
-        results = (await self._asearx_api_query(params)).results
+        params = self._build_params(query, engines, None, query_suffix, kwargs)
+        results = (await self._asearx_api_query(params, timeout)).results
         # filter out result if url is not empty
         results = [result for result in results if result["url"]]
         results = results[:num_results]
@@ -488,6 +468,67 @@ class SearxSearchWrapper(BaseModel):
                 "link": result["url"],
                 "engines": result["engines"],
                 "category": result["category"],
+                "score": result.get("score", 0.0),
             }
             for result in results
         ]
+
+    def results_many(
+        self,
+        queries: List[str],
+        num_results: int,
+        engines: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[List[Dict]]:
+        """Run several queries concurrently and return their `results` in order.
+
+        The queries run on a thread pool of max_workers threads, by default as
+        many as the connection pool keeps per host. The first failed query
+        raises its error.
+        """
+        if not queries:
+            return []
+        workers = max_workers or min(len(queries), POOL_LIMIT_PER_HOST)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="searx") as executor:
+            return list(executor.map(
+                lambda query: self.results(
+                    query, num_results, engines, categories, query_suffix, timeout, **kwargs
+                ),
+                queries,
+            ))
+
+    async def aresults_many(
+        self,
+        queries: List[str],
+        num_results: int,
+        engines: Optional[List[str]] = None,
+        query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> List[List[Dict]]:
+        """Asynchronous version of `results_many`; concurrency is bounded by the session pool."""
+        return list(await asyncio.gather(*(
+            self.aresults(query, num_results, engines, query_suffix, timeout, **kwargs) for query in queries
+        )))
+
+    async def ahits(
+        self,
+        query: str,
+        num_results: int,
+        engines: Optional[List[str]] = None,
+        query_suffix: Optional[str] = "",
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> List[SearchHit]:
+        """Asynchronously query and return :class:`SearchHit` records.
+
+        Same as `aresults` without converting the hits to legacy dicts.
+        """
+        params = self._build_params(query, engines, None, query_suffix, kwargs)
+        hits = (await self._asearx_api_query(params, timeout)).hits
+        # filter out result if url is not empty
+        return [hit for hit in hits if hit.url][:num_results]
@@ -0,0 +1,277 @@
+"""
+HTTP Serving
+
+Runs the MCP server over a network transport (streamable HTTP or SSE) so one
+long-lived process can serve many agents, sharing its connection pool, result
+cache, rate limiters and breakers instead of every agent spawning a cold stdio
+server.
+
+On SIGTERM/SIGINT the server rejects new and queued searches and waits up to
+the drain timeout for the running ones, then stops accepting connections and
+closes the remaining ones. It keeps listening while draining because an MCP
+client may open further connections (e.g. its SSE listener) during a call.
+
+A single event loop tops out at a few hundred searches per second, mostly
+spent decoding JSON and serializing results. :class:`Supervisor` therefore runs
+several worker processes on one port: on Linux each worker listens on its own
+``SO_REUSEPORT`` socket so the kernel spreads connections evenly, elsewhere
+the workers share the supervisor's listening socket. Workers have their own
+connection pool and in-memory cache, share the on-disk result cache and publish
+their metrics to a stats directory that the supervisor and every worker's
+``searx-stats://`` resource aggregate. Crashed workers are restarted, with a
+growing delay while they keep crashing right after start.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+import uvicorn
+from sse_starlette.sse import AppStatus
+from starlette.types import ASGIApp
+
+from .admission import InFlightLimit
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+# Transport settings, overridable through the environment
+TRANSPORT = os.getenv("SEARX_MCP_TRANSPORT", "stdio")
+HOST = os.getenv("SEARX_MCP_HOST", "127.0.0.1")
+PORT = int(os.getenv("SEARX_MCP_PORT", "8000"))
+DRAIN_TIMEOUT = float(os.getenv("SEARX_DRAIN_TIMEOUT", "30"))
+WORKERS = int(os.getenv("SEARX_WORKERS", "1"))
+
+# Linux balances connections over SO_REUSEPORT sockets; elsewhere the last
+# socket bound may take them all, so workers share one socket instead
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT") and sys.platform.startswith("linux")
+
+# A worker that dies within MIN_UPTIME is restarted after a delay doubling from
+# RESTART_DELAY up to MAX_RESTART_DELAY
+MIN_UPTIME = 10.0
+RESTART_DELAY = 0.5
+MAX_RESTART_DELAY = 30.0
+
+# Time given to write the results of drained searches before SSE streams end,
+# and then to close the remaining connections
+FLUSH_DELAY = 0.5
+FLUSH_TIMEOUT = 5.0
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains in-flight searches before shutting down."""
+
+    def __init__(self, config: uvicorn.Config, limit: InFlightLimit, drain_timeout: float):
+        super().__init__(config)
+        self.limit = limit
+        self.drain_timeout = drain_timeout
+        # a worker shuts down when its supervisor is gone
+        self.parent_pid: Optional[int] = None
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.parent_pid is not None and counter % 10 == 0 and os.getppid() != self.parent_pid:
+            print("Supervisor exited, shutting down worker", file=sys.stderr)
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+    async def shutdown(self, sockets=None) -> None:
+        running = self.limit.in_flight
+        if running:
+            print(f"Draining {running} searches (up to {self.drain_timeout:g}s)", file=sys.stderr)
+        if not await self.limit.drain(self.drain_timeout):
+            print(f"Drain timed out with {self.limit.in_flight} searches in flight", file=sys.stderr)
+        if running:
+            await asyncio.sleep(FLUSH_DELAY)
+        # results are delivered, now end the SSE streams; open listeners would
+        # otherwise hold the connections forever
+        AppStatus.should_exit = True
+        self.config.timeout_graceful_shutdown = FLUSH_TIMEOUT
+        await super().shutdown(sockets)
+
+
+async def serve_http(
+    app: ASGIApp,
+    limit: InFlightLimit,
+    host: str = HOST,
+    port: int = PORT,
+    drain_timeout: float = DRAIN_TIMEOUT,
+    log_level: str = "error",
+    path: Optional[str] = None,
+    sock: Optional[socket.socket] = None,
+) -> None:
+    """Serve app until SIGTERM/SIGINT, then drain the searches admitted by limit.
+
+    Listens on sock if given (a worker), announcing the address otherwise.
+    """
+    # sse_starlette ends every SSE stream (and with it the responses of running
+    # tool calls) as soon as the signal arrives; we end them after the drain
+    if hasattr(AppStatus, "disable_automatic_graceful_drain"):
+        AppStatus.disable_automatic_graceful_drain()
+    config = uvicorn.Config(app, host=host, port=port, log_level=log_level, lifespan="on")
+    server = DrainingServer(config, limit, drain_timeout)
+    if sock is not None:
+        server.parent_pid = os.getppid()
+        await server.serve(sockets=[sock])
+        return
+    print(f"Serving MCP on http://{host}:{port}{path or ''}", file=sys.stderr)
+    await server.serve()
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False, listen: bool = True) -> socket.socket:
+    """TCP socket bound to host:port, optionally sharing the port via SO_REUSEPORT."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if listen:
+        sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def worker_socket(host: str, port: int, shared: Optional[socket.socket]) -> socket.socket:
+    """Listening socket of a worker: the supervisor's, or its own SO_REUSEPORT one."""
+    return shared if shared is not None else bind_socket(host, port, reuse_port=True)
+
+
+class Supervisor:
+    """Keeps ``workers`` processes serving one port and restarts those that die.
+
+    ``target(*args, host, port, sock)`` runs a worker; sock is the shared
+    listening socket, or None when the worker should bind its own with
+    :func:`worker_socket`. Workers get ``SEARX_WORKER_ID``, ``SEARX_STATS_DIR``
+    and, unless configured, a temporary ``SEARX_CACHE_DIR`` in their environment.
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., None],
+        args: Tuple[Any, ...],
+        workers: int,
+        host: str = HOST,
+        port: int = PORT,
+        drain_timeout: float = DRAIN_TIMEOUT,
+        metrics_file: Optional[str] = None,
+        metrics_interval: float = 15.0,
+    ):
+        self.target = target
+        self.args = args
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.drain_timeout = drain_timeout
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * workers
+        self._started = [0.0] * workers
+        self._failures = [0] * workers
+        self._restart_at = [0.0] * workers
+        self._stopping = False
+        self._temp_dirs: List[str] = []
+
+    def _prepare(self) -> None:
+        cache_dir = os.getenv("SEARX_CACHE_DIR")
+        if not cache_dir:
+            cache_dir = tempfile.mkdtemp(prefix="searxng-cache-")
+            self._temp_dirs.append(cache_dir)
+            os.environ["SEARX_CACHE_DIR"] = cache_dir
+        self.stats_dir = os.path.join(os.path.expanduser(cache_dir), f"workers-{os.getpid()}")
+        os.makedirs(self.stats_dir, exist_ok=True)
+        self._temp_dirs.append(self.stats_dir)
+        os.environ["SEARX_STATS_DIR"] = self.stats_dir
+        # reserve the port (resolving port 0) before any worker starts; with
+        # SO_REUSEPORT the socket does not listen, so it takes no connections
+        self.sock = bind_socket(self.host, self.port, reuse_port=REUSE_PORT, listen=not REUSE_PORT)
+        self.port = self.sock.getsockname()[1]
+
+    def _start(self, index: int) -> None:
+        os.environ["SEARX_WORKER_ID"] = str(index)
+        try:
+            process = self._context.Process(
+                target=self.target,
+                args=(*self.args, self.host, self.port, None if REUSE_PORT else self.sock),
+                name=f"searxng-worker-{index}",
+            )
+            process.start()
+        finally:
+            del os.environ["SEARX_WORKER_ID"]
+        self._processes[index] = process
+        self._started[index] = time.monotonic()
+
+    def _reap(self, index: int, now: float) -> None:
+        process = self._processes[index]
+        self._processes[index] = None
+        self.restarts += 1
+        if now - self._started[index] < MIN_UPTIME:
+            self._failures[index] += 1
+        else:
+            self._failures[index] = 0
+        delay = 0.0
+        if self._failures[index]:
+            delay = min(MAX_RESTART_DELAY, RESTART_DELAY * 2 ** (self._failures[index] - 1))
+        self._restart_at[index] = now + delay
+        print(
+            f"Worker {index} (pid {process.pid}) exited with {process.exitcode}, restarting in {delay:g}s",
+            file=sys.stderr,
+        )
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._stopping = True
+
+    def write_metrics(self) -> None:
+        from .metrics import aggregate
+        try:
+            aggregate(self.stats_dir).write_prometheus(self.metrics_file)
+        except OSError as e:
+            print(f"Writing metrics failed: {e}", file=sys.stderr)
+
+    def run(self) -> int:
+        """Run the workers until SIGTERM/SIGINT, then stop them gracefully."""
+        self._prepare()
+        previous = {sig: signal.signal(sig, self._handle_signal) for sig in (signal.SIGTERM, signal.SIGINT)}
+        print(f"Serving MCP on http://{self.host}:{self.port} with {self.workers} workers", file=sys.stderr)
+        next_dump = time.monotonic() + self.metrics_interval
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                for index, process in enumerate(self._processes):
+                    if process is not None and not process.is_alive():
+                        self._reap(index, now)
+                    elif process is None and now >= self._restart_at[index]:
+                        self._start(index)
+                if self.metrics_file and now >= next_dump:
+                    self.write_metrics()
+                    next_dump = now + self.metrics_interval
+                time.sleep(0.2)
+            self._stop()
+            if self.metrics_file:
+                self.write_metrics()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self.sock.close()
+            for directory in reversed(self._temp_dirs):
+                shutil.rmtree(directory, ignore_errors=True)
+        return 0
+
+    def _stop(self) -> None:
+        running = [p for p in self._processes if p is not None and p.is_alive()]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + self.drain_timeout + FLUSH_DELAY + FLUSH_TIMEOUT + 5
+        for process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                print(f"Killing worker pid {process.pid}", file=sys.stderr)
+                process.kill()
+                process.join()
@@ -0,0 +1,170 @@
+"""
+Shared HTTP sessions
+
+This module owns the process-wide aiohttp connection pool used by every async
+search call. The MCP server lifespan and the CLI hold it open with
+:func:`session_scope` and close it on shutdown. Requests outside of a scope
+(e.g. a library caller's ``asyncio.run``) get a session of their own that is
+closed with the request, as no one would close a shared one.
+
+Sync callers (:class:`~searxng.searx_search.SearxSearchWrapper` in threaded
+code) share a ``requests`` session with a keep-alive pool sized by the same
+settings, instead of opening a connection per search.
+"""
+
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional
+
+from . import tracing
+
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+
+# Connection pool settings, overridable through the environment
+POOL_LIMIT = int(os.getenv("SEARX_POOL_LIMIT", "100"))
+POOL_LIMIT_PER_HOST = int(os.getenv("SEARX_POOL_LIMIT_PER_HOST", "20"))
+KEEPALIVE_TIMEOUT = float(os.getenv("SEARX_KEEPALIVE_TIMEOUT", "30"))
+DNS_CACHE_TTL = int(os.getenv("SEARX_DNS_CACHE_TTL", "300"))
+
+_session: Optional["aiohttp.ClientSession"] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_scopes = 0
+
+_sync_session: Optional["requests.Session"] = None
+_sync_pid: Optional[int] = None
+_sync_lock = threading.Lock()
+
+
+def _create_session() -> "aiohttp.ClientSession":
+    # imported on first use so that startup does not pay for it
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=POOL_LIMIT,
+        limit_per_host=POOL_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        trace_configs=[tracing.trace_config()] if tracing.enabled() else None,
+    )
+
+
+def get_session() -> "aiohttp.ClientSession":
+    """Return the shared session, creating it on first use.
+
+    A session is bound to the event loop it was created on, so a new one is
+    created when called from a different loop (e.g. consecutive ``asyncio.run``).
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = _create_session()
+        _session_loop = loop
+    return _session
+
+
+def pool_stats() -> Dict[str, int]:
+    """Usage of the shared connection pool: limit, connections in use and idle."""
+    connector = _session.connector if _session is not None and not _session.closed else None
+    if connector is None:
+        return {"limit": POOL_LIMIT, "in_use": 0, "idle": 0}
+    # aiohttp has no public accessors for these
+    acquired = getattr(connector, "_acquired", ())
+    idle = getattr(connector, "_conns", {})
+    return {
+        "limit": connector.limit,
+        "in_use": len(acquired),
+        "idle": sum(len(conns) for conns in idle.values()),
+    }
+
+
+async def close_session() -> None:
+    """Close the shared session and release its pooled connections."""
+    global _session, _session_loop
+    session, _session, _session_loop = _session, None, None
+    if session is not None and not session.closed:
+        await session.close()
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator["aiohttp.ClientSession"]:
+    """Keep the shared session open for the duration of the block.
+
+    Scopes nest; the session is closed when the last one exits.
+    """
+    global _scopes
+    _scopes += 1
+    try:
+        yield get_session()
+    finally:
+        _scopes -= 1
+        if _scopes == 0:
+            await close_session()
+
+
+@asynccontextmanager
+async def request_session() -> AsyncIterator["aiohttp.ClientSession"]:
+    """Session for one request: the shared one within a scope, else a temporary one."""
+    if _scopes and _session_loop is asyncio.get_running_loop():
+        yield get_session()
+        return
+    session = _create_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def create_sync_session(
+    pool_size: int = POOL_LIMIT_PER_HOST, pool_hosts: Optional[int] = None
+) -> "requests.Session":
+    """requests session keeping up to pool_size connections per host alive.
+
+    pool_hosts is the number of hosts with a pool, by default as many as fit
+    SEARX_POOL_LIMIT. Connections beyond pool_size are opened as needed but not
+    kept. Failed requests are not retried here; callers apply the retry policy.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    if pool_hosts is None:
+        pool_hosts = max(1, POOL_LIMIT // max(1, pool_size))
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=0)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_sync_session() -> "requests.Session":
+    """Return the shared requests session, creating it on first use.
+
+    The session is shared by all threads: urllib3's pools are thread-safe and
+    the session is not modified after creation. A forked child creates its own
+    instead of reusing the parent's sockets.
+    """
+    global _sync_session, _sync_pid
+    session = _sync_session
+    if session is not None and _sync_pid == os.getpid():
+        return session
+    with _sync_lock:
+        if _sync_session is None or _sync_pid != os.getpid():
+            _sync_session = create_sync_session()
+            _sync_pid = os.getpid()
+        return _sync_session
+
+
+def close_sync_session() -> None:
+    """Close the shared requests session and release its pooled connections."""
+    global _sync_session, _sync_pid
+    with _sync_lock:
+        session, _sync_session, _sync_pid = _sync_session, None, None
+    if session is not None:
+        session.close()
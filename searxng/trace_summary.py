@@ -0,0 +1,52 @@
+"""
+Trace Summary
+
+Prints the phase breakdown of trace files written with ``SEARX_TRACE`` or the
+CLI ``--trace`` option: count, mean and percentiles per phase, in ms.
+
+Usage:
+  python -m searxng.trace_summary traces.jsonl [traces.jsonl.1 ...]
+"""
+
+import argparse
+import json
+from typing import Dict, List
+
+
+def summarize(paths: List[str]) -> str:
+    """Phase breakdown (count, mean and percentiles in ms) of the traces in paths."""
+    phases: Dict[str, List[float]] = {}
+    traces = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                traces += 1
+                phases.setdefault(f"[{record['name']}]", []).append(record["duration_ms"])
+                for item in record["spans"]:
+                    phases.setdefault(item["name"], []).append(item["duration_ms"])
+
+    def percentile(values: List[float], q: float) -> float:
+        return values[min(len(values) - 1, int(len(values) * q))]
+
+    lines = [f"{traces} traces", f"{'phase':<20}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+    for name, values in sorted(phases.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        lines.append(
+            f"{name:<20}{len(values):>8}{sum(values) / len(values):>10.1f}{percentile(values, 0.5):>10.1f}"
+            f"{percentile(values, 0.9):>10.1f}{percentile(values, 0.99):>10.1f}{values[-1]:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize SearxNG trace files (times in ms)")
+    parser.add_argument("paths", nargs="+", help="JSONL trace files written with SEARX_TRACE or --trace")
+    args = parser.parse_args()
+    print(summarize(args.paths))
+
+
+if __name__ == "__main__":
+    main()
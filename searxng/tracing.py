@@ -0,0 +1,188 @@
+"""
+Request Tracing
+
+Opt-in tracing of searches with per-phase timings: cache lookups, rate limit
+waits, DNS, connection setup, waiting for SearXNG (time to first byte), body
+download, JSON decode and result conversion. Network phases come from aiohttp
+trace hooks on the shared session; the other phases are timed with ``span``.
+
+Enable it with ``SEARX_TRACE=<file>`` or the CLI ``--trace FILE`` option. Each
+sampled search is appended to the file as one JSON line, and the file is
+rotated once it grows past ``SEARX_TRACE_MAX_BYTES``. Summarize a trace file
+with::
+
+    python -m searxng.trace_summary traces.jsonl
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# Tracing settings, overridable through the environment
+TRACE_FILE = os.getenv("SEARX_TRACE")
+TRACE_SAMPLE = float(os.getenv("SEARX_TRACE_SAMPLE", "1.0"))
+TRACE_MAX_BYTES = int(os.getenv("SEARX_TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("SEARX_TRACE_BACKUPS", "3"))
+
+
+class Trace:
+    """Spans recorded for one traced call."""
+
+    __slots__ = ("trace_id", "name", "started", "attrs", "spans")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started = time.perf_counter()
+        self.attrs = attrs
+        self.spans: List[Dict[str, Any]] = []
+
+    def add(self, name: str, start: float, end: float, **attrs: Any) -> None:
+        self.spans.append({
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            **attrs,
+        })
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "ts": time.time(),
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            **self.attrs,
+            "spans": self.spans,
+        }
+
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("searx_trace", default=None)
+_logger: Optional[logging.Logger] = None
+_sample = TRACE_SAMPLE
+
+
+def configure(path: Optional[str], sample: Optional[float] = None) -> None:
+    """Enable tracing to a rotating JSONL file at path (None disables it)."""
+    global _logger, _sample
+    if sample is not None:
+        _sample = sample
+    if _logger is not None:
+        for handler in _logger.handlers:
+            handler.close()
+        _logger.handlers.clear()
+        _logger = None
+    if not path:
+        return
+    handler = logging.handlers.RotatingFileHandler(
+        os.path.expanduser(path), maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger = logging.getLogger("searxng.tracing")
+    _logger.propagate = False
+    _logger.setLevel(logging.INFO)
+    _logger.addHandler(handler)
+
+
+def enabled() -> bool:
+    return _logger is not None
+
+
+@contextmanager
+def trace(name: str, **attrs: Any) -> Iterator[Optional[Trace]]:
+    """Trace the block as a root call, or as a span when a trace is already active.
+
+    Sampled traces are written when the block exits.
+    """
+    parent = _current.get()
+    if parent is not None:
+        with span(name, **attrs):
+            yield parent
+        return
+    if _logger is None or random.random() >= _sample:
+        yield None
+        return
+    current = Trace(name, attrs)
+    token = _current.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        record = current.record()
+        if error:
+            record["error"] = error
+        _logger.info(json.dumps(record, separators=(",", ":"), default=str))
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """Time the block as a span of the active trace; a no-op without one."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.add(name, start, time.perf_counter(), **attrs)
+
+
+def add_span(name: str, start: float, end: float, **attrs: Any) -> None:
+    """Record an already measured span (perf_counter times) on the active trace."""
+    current = _current.get()
+    if current is not None:
+        current.add(name, start, end, **attrs)
+
+
+def _hook(phase: str, start_key: str):
+    async def end(session, ctx, params) -> None:
+        current = _current.get()
+        start = getattr(ctx, start_key, None)
+        if current is not None and start is not None:
+            current.add(phase, start, time.perf_counter())
+
+    return end
+
+
+def _mark(key: str):
+    async def start(session, ctx, params) -> None:
+        setattr(ctx, key, time.perf_counter())
+
+    return start
+
+
+def trace_config() -> "aiohttp.TraceConfig":
+    """aiohttp hooks recording pool wait, DNS, connect and time to first byte spans.
+
+    The connect span includes the DNS lookup of a new connection.
+    """
+    import aiohttp
+
+    config = aiohttp.TraceConfig()
+    config.on_connection_queued_start.append(_mark("queued"))
+    config.on_connection_queued_end.append(_hook("pool_wait", "queued"))
+    config.on_dns_resolvehost_start.append(_mark("dns"))
+    config.on_dns_resolvehost_end.append(_hook("dns", "dns"))
+    config.on_connection_create_start.append(_mark("connect"))
+    config.on_connection_create_end.append(_hook("connect", "connect"))
+    config.on_request_headers_sent.append(_mark("sent"))
+    # request end fires once the response headers arrived
+    config.on_request_end.append(_hook("ttfb", "sent"))
+    return config
+
+
+configure(TRACE_FILE)
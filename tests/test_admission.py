@@ -0,0 +1,42 @@
+import asyncio
+
+from searxng import admission
+from searxng.admission import InFlightLimit
+
+
+def test_slot_handed_over_at_queue_timeout_is_kept(monkeypatch):
+    limit = InFlightLimit(limit=1, queue_timeout=0.05)
+
+    async def wait_for(future, timeout):
+        # release() admits the waiter in the same loop iteration as its timeout
+        limit.release()
+        raise asyncio.TimeoutError
+
+    async def main():
+        await limit.acquire()
+        monkeypatch.setattr(admission.asyncio, "wait_for", wait_for)
+        await limit.acquire()
+        monkeypatch.undo()
+        assert limit.in_flight == 1 and limit.rejected == 0
+        limit.release()
+        assert await limit.drain(0.1)
+
+    asyncio.run(main())
+
+
+def test_queued_acquire_is_rejected_after_queue_timeout():
+    limit = InFlightLimit(limit=1, queue_timeout=0.05)
+
+    async def main():
+        await limit.acquire()
+        try:
+            await limit.acquire()
+        except admission.ServerBusyError:
+            pass
+        else:
+            raise AssertionError("second acquire was admitted")
+        assert limit.in_flight == 1 and limit.rejected == 1
+        limit.release()
+        assert limit.in_flight == 0
+
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from stub_server import StubSearx  # noqa: E402
+
+from searxng import cli  # noqa: E402
+from searxng.session import close_session  # noqa: E402
+
+
+def batch_args(host, **options):
+    defaults = dict(
+        batch="-", host=host, num_results=10, engines=None, categories=None, time_range=None,
+        refresh=False, fanout=False, deadline=None, hedge=False, concurrency=4, ordered=False,
+    )
+    return argparse.Namespace(**{**defaults, **options})
+
+
+def run_batch(monkeypatch, lines, stub=None, **options):
+    """Run a batch over lines against a stub; return the exit code and NDJSON records."""
+    stub = stub or StubSearx()
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdin", io.StringIO("".join(line + "\n" for line in lines)))
+    monkeypatch.setattr(sys, "stdout", stdout)
+
+    async def main():
+        url = await stub.start()
+        try:
+            return await cli.run_batch(batch_args(url, **options))
+        finally:
+            await stub.stop()
+            await close_session()
+
+    code = asyncio.run(main())
+    return code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_batch_writes_one_record_per_line_and_reports_malformed_lines(monkeypatch):
+    lines = ["alpha", "{not json", "", '{"query": "beta", "num_results": 5}', '{"engines": "google"}']
+    code, records = run_batch(monkeypatch, lines)
+    assert code == 1
+    by_index = {record["index"]: record for record in records}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[0]["query"] == "alpha" and len(by_index[0]["results"]) == 10 and by_index[0]["error"] is None
+    assert by_index[2]["query"] == "beta" and len(by_index[2]["results"]) == 5
+    assert by_index[1]["error"].startswith("Invalid input on line 2")
+    assert by_index[3]["error"].startswith("Invalid input on line 5")
+
+
+def test_ordered_batch_keeps_input_order_and_bounds_pending_searches(monkeypatch):
+    running = peak = 0
+    search = cli.searx_search
+
+    async def counted(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            return await search(**kwargs)
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(cli, "searx_search", counted)
+    queries = [f"ordered {i}" for i in range(20)]
+    code, records = run_batch(
+        monkeypatch, queries, StubSearx(latency="uniform:0.01:0.08"), concurrency=3, ordered=True
+    )
+    assert code == 0
+    assert [record["query"] for record in records] == queries
+    assert [record["index"] for record in records] == list(range(20))
+    assert peak == 3
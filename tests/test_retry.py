@@ -0,0 +1,68 @@
+import pytest
+
+from searxng.client import (
+    SearxAPIError,
+    SearxConnectionError,
+    SearxDecodeError,
+    SearxRateLimitError,
+    SearxServerError,
+    SearxTimeoutError,
+    _status_error,
+)
+from searxng.retry import RetryPolicy
+
+
+@pytest.mark.parametrize("error, transient", [
+    (SearxConnectionError("refused"), True),
+    (SearxTimeoutError("slow"), True),
+    (SearxServerError(502), True),
+    (SearxRateLimitError(429), True),
+    (SearxAPIError(400), False),
+    (SearxDecodeError("not json"), False),
+    (ValueError("not a searx error"), False),
+])
+def test_transient_errors_are_retryable(error, transient):
+    assert RetryPolicy.retryable(error) is transient
+
+
+@pytest.mark.parametrize("status, error_class", [
+    (400, SearxAPIError),
+    (403, SearxAPIError),
+    (429, SearxRateLimitError),
+    (500, SearxServerError),
+    (503, SearxRateLimitError),
+])
+def test_status_errors_are_classified(status, error_class):
+    assert type(_status_error(status, "")) is error_class
+
+
+def test_backoff_grows_exponentially_up_to_max_delay():
+    policy = RetryPolicy(retries=10, base_delay=0.1, max_delay=0.5)
+    error = SearxServerError(502)
+    for attempt, cap in enumerate([0.1, 0.2, 0.4, 0.5, 0.5]):
+        delays = [policy.backoff(attempt, error, None) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > cap / 2
+
+
+def test_backoff_stops_after_the_allowed_retries():
+    policy = RetryPolicy(retries=2)
+    error = SearxConnectionError("refused")
+    assert policy.backoff(1, error, None) is not None
+    assert policy.backoff(2, error, None) is None
+
+
+def test_backoff_does_not_retry_permanent_errors():
+    assert RetryPolicy().backoff(0, SearxAPIError(400), None) is None
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.2)
+    assert policy.backoff(0, SearxRateLimitError(429, retry_after=1.5), None) == 1.5
+    assert policy.backoff(0, SearxRateLimitError(429, retry_after=1.5), 2.0) == 1.5
+
+
+def test_backoff_does_not_retry_past_the_deadline():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.2)
+    assert policy.backoff(0, SearxRateLimitError(429, retry_after=1.5), 1.0) is None
+    assert policy.backoff(0, SearxServerError(502), 0.0) is None
@@ -0,0 +1,318 @@
+import asyncio
+import os
+import sqlite3
+import sys
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from stub_server import StubSearx  # noqa: E402
+
+from searxng.breaker import SearxCircuitOpenError, engine_breakers  # noqa: E402
+from searxng.client import (  # noqa: E402
+    SearchHit,
+    SearxAPIError,
+    SearxServerError,
+    SearxTimeoutError,
+    Timeouts,
+    get_client,
+)
+from searxng.hosts import get_pool  # noqa: E402
+from searxng.ratelimit import RateLimiter  # noqa: E402
+from searxng import search  # noqa: E402
+from searxng.search import ResultCache, cache_key, searx_search  # noqa: E402
+from searxng.session import close_session  # noqa: E402
+
+
+def run_against_stub(scenario, stub=None, **stub_options):
+    stub = stub or StubSearx(**stub_options)
+
+    async def main():
+        url = await stub.start()
+        try:
+            return await scenario(url)
+        finally:
+            await stub.stop()
+            await close_session()
+
+    return asyncio.run(main())
+
+
+def engine_state(url: str, engine: str) -> str:
+    for breaker in engine_breakers.stats():
+        if breaker["host"].startswith(url) and breaker["engine"] == engine:
+            return breaker["state"]
+    return "closed"
+
+
+def test_deadline_timeouts_do_not_open_engine_breaker():
+    async def scenario(url):
+        for i in range(3):
+            with pytest.raises(SearxTimeoutError) as error:
+                await searx_search(url, f"short {i}", engines=["google"], deadline=0.1, refresh=True)
+            assert error.value.deadline
+        assert engine_state(url, "google") == "closed"
+        host = get_pool([url]).hosts[0]
+        assert host.requests == 3 and host.failures == 0 and host.ejected_until == 0
+        return await searx_search(url, "long", engines=["google"], deadline=5, refresh=True)
+
+    assert run_against_stub(scenario, latency="fixed:0.3")
+
+
+def test_request_timeouts_open_engine_breaker():
+    async def scenario(url):
+        # the per-request limit fires with most of the deadline left
+        with pytest.raises((SearxTimeoutError, SearxCircuitOpenError)):
+            await searx_search(url, "slow", engines=["google"], deadline=5, timeouts=Timeouts(total=0.1), refresh=True)
+        assert engine_state(url, "google") == "open"
+        with pytest.raises(SearxCircuitOpenError):
+            await searx_search(url, "next", engines=["google"], deadline=5, refresh=True)
+
+    run_against_stub(scenario, latency="fixed:0.3")
+
+
+def test_waiter_outlives_leader_deadline():
+    async def scenario(url):
+        leader = asyncio.ensure_future(searx_search(url, "shared", engines=["google"], deadline=0.2))
+        await asyncio.sleep(0.05)
+        waiter = await searx_search(url, "shared", engines=["google"], deadline=10)
+        with pytest.raises(SearxTimeoutError):
+            await leader
+        return waiter
+
+    assert run_against_stub(scenario, latency="fixed:0.5")
+
+
+def test_rate_limiter_paces_only_after_throttling():
+    limiter = RateLimiter("http://searx.test", rate=None, burst=1, max_wait=5)
+    assert all(limiter.wait() == 0.0 for _ in range(50))
+    limiter.throttle()
+    assert 0 < limiter.stats()["rate"] <= 25
+    assert limiter.wait() > 0
+
+
+def test_cached_empty_results_count_as_negative_hits():
+    cache = ResultCache(ttl=60)
+    cache.set(("empty",), [])
+    results, fresh = cache.lookup(("empty",))
+    assert results == [] and fresh
+    stats = cache.stats()
+    assert stats["negative_hits"] == 1 and stats["hits"] == 0 and stats["hit_ratio"] == 0.0
+
+
+class BrokenDiskCache:
+    def get(self, key):
+        raise sqlite3.OperationalError("database is locked")
+
+    def set(self, key, results):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_disk_cache_errors_do_not_fail_the_search(monkeypatch):
+    monkeypatch.setattr(search, "disk_cache", BrokenDiskCache())
+
+    async def scenario(url):
+        return await searx_search(url, "locked", raise_errors=True)
+
+    assert len(run_against_stub(scenario)) == 10
+
+
+class RejectingStub(StubSearx):
+    """Answers every result page from first_page on with an error status."""
+
+    def __init__(self, status=400, first_page=1, **options):
+        super().__init__(**options)
+        self.status = status
+        self.first_page = first_page
+
+    async def search(self, request):
+        if int(request.query.get("pageno", "1")) < self.first_page:
+            return await super().search(request)
+        self.requests += 1
+        await asyncio.sleep(self.latency.sample(self.rnd))
+        return web.Response(status=self.status, text="Rejected")
+
+
+def test_failed_later_page_is_partial_and_not_cached():
+    stub = RejectingStub(first_page=2)
+
+    async def scenario(url):
+        return await searx_search(url, "pages", num_results=30), await searx_search(url, "pages", num_results=30)
+
+    first, second = run_against_stub(scenario, stub)
+    assert len(first) == 10 and first.truncated and first.partial
+    assert len(second) == 10 and stub.requests == 6
+
+
+@pytest.mark.parametrize("budget", [0.0, -0.01])
+def test_exhausted_budget_times_out_without_a_request(budget):
+    async def scenario(url):
+        client = get_client(url)
+        with pytest.raises(SearxTimeoutError) as error:
+            await client.aquery(client.build_params("spent"), budget)
+        assert error.value.deadline
+
+    run_against_stub(scenario, latency="fixed:1")
+
+
+def test_fanout_requests_one_page_per_engine():
+    stub = StubSearx()
+
+    async def scenario(url):
+        return await searx_search(url, "wide", num_results=50, engines=["google", "bing", "brave"], fanout=True)
+
+    results = run_against_stub(scenario, stub)
+    assert stub.requests == 3 and len(results) == 10 and not results.partial
+
+
+def test_identical_searches_share_one_request():
+    stub = StubSearx(latency="fixed:0.2")
+
+    async def scenario(url):
+        return await asyncio.gather(*(searx_search(url, "together") for _ in range(5)))
+
+    results = run_against_stub(scenario, stub)
+    assert stub.requests == 1 and all(len(r) == 10 for r in results)
+    assert len({id(r) for r in results}) == 5
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    stub = StubSearx(latency="fixed:0.2")
+
+    async def scenario(url):
+        callers = [asyncio.ensure_future(searx_search(url, "cancel one")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        callers[0].cancel()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    first, *others = run_against_stub(scenario, stub)
+    assert isinstance(first, asyncio.CancelledError)
+    assert stub.requests == 1 and all(len(r) == 10 for r in others)
+
+
+def test_shared_error_reaches_every_waiter():
+    stub = RejectingStub(latency="fixed:0.2")
+
+    async def scenario(url):
+        return await asyncio.gather(*(searx_search(url, "rejected") for _ in range(3)), return_exceptions=True)
+
+    errors = run_against_stub(scenario, stub)
+    assert stub.requests == 1 and all(isinstance(e, SearxAPIError) for e in errors)
+
+
+def test_failing_host_is_ejected_and_probed_back_in():
+    bad, good = StubSearx(error_rate=1.0), StubSearx()
+
+    async def main():
+        urls = [await bad.start(), await good.start()]
+        try:
+            pool = get_pool(urls)
+            pool.eject_seconds = 0.2
+            failing = pool.hosts[0]
+            # the first pick between two fresh hosts is random, then the failing one scores best
+            for i in range(pool.eject_after + 1):
+                assert len(await searx_search(urls, f"failover {i}", raise_errors=True)) == 10
+                if failing.failures == pool.eject_after:
+                    break
+            assert failing.failures == pool.eject_after and failing.ejected_until > 0
+            # while ejected, searches go straight to the healthy host
+            requests = bad.requests
+            assert len(await searx_search(urls, "ejected", raise_errors=True)) == 10
+            assert bad.requests == requests
+            # once the ejection expires, one probe readmits the recovered host
+            bad.error_rate = 0.0
+            await asyncio.sleep(0.25)
+            assert len(await searx_search(urls, "probe", raise_errors=True)) == 10
+            assert bad.requests == requests + 1
+            assert failing.consecutive_failures == 0 and failing.ejected_until == 0 and not failing.probing
+        finally:
+            await bad.stop()
+            await good.stop()
+            await close_session()
+
+    asyncio.run(main())
+
+
+def test_transient_server_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(search.retry_policy, "retries", 2)
+    monkeypatch.setattr(search.retry_policy, "base_delay", 0.01)
+    stub = StubSearx(error_rate=1.0)
+
+    async def scenario(url):
+        with pytest.raises(SearxServerError):
+            await searx_search(url, "flaky", refresh=True)
+
+    run_against_stub(scenario, stub)
+    assert stub.requests == 3
+
+
+def test_rejected_searches_are_not_retried(monkeypatch):
+    monkeypatch.setattr(search.retry_policy, "retries", 2)
+    stub = RejectingStub(status=400)
+
+    async def scenario(url):
+        with pytest.raises(SearxAPIError):
+            await searx_search(url, "bad request", refresh=True)
+
+    run_against_stub(scenario, stub)
+    assert stub.requests == 1
+
+
+def hits(*urls):
+    return [SearchHit(f"title {url}", url, "content", ("google",), "general", 1.0) for url in urls]
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = ResultCache(ttl=60, max_entries=2)
+    cache.set(("a",), hits("a"))
+    cache.set(("b",), hits("b"))
+    assert cache.get(("a",)) == hits("a")
+    cache.set(("c",), hits("c"))
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == hits("a") and cache.get(("c",)) == hits("c")
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_cache_stays_within_its_byte_budget():
+    entry_size = search._results_size(hits("https://example.com/0"))
+    cache = ResultCache(ttl=60, max_bytes=3 * entry_size)
+    for i in range(5):
+        cache.set((i,), hits(f"https://example.com/{i}"))
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["bytes"] <= 3 * entry_size and cache.evictions == 2
+    assert cache.get((0,)) is None and cache.get((4,)) is not None
+    cache.set(("huge",), hits(*(f"https://example.com/{i}" for i in range(100))))
+    assert cache.get(("huge",)) is None and cache.stats()["entries"] == 3
+
+
+def test_cache_returns_copies():
+    cache = ResultCache(ttl=60)
+    cache.set(("a",), hits("a"))
+    cache.get(("a",)).clear()
+    assert cache.get(("a",)) == hits("a")
+
+
+def test_cache_key_normalizes_equivalent_searches():
+    key = cache_key("http://searx.test/", "Python  asyncio ", 10, ["Google", "bing"], ["IT"], None)
+    assert key == cache_key(" http://SEARX.test", "python asyncio", 10, ["bing", " google"], ["it"], None)
+    assert key == cache_key("http://searx.test", "python asyncio", 10, ["bing", "google", "bing"], ["it", ""])
+    assert key != cache_key("http://searx.test", "python asyncio", 20, ["bing", "google"], ["it"])
+    assert key != cache_key("http://searx.test", "python asyncio", 10, ["bing", "google"], ["it"], "day")
+    assert key != cache_key("http://searx.test", "python asyncio", 10, ["bing", "google"], ["it"], fanout=True)
+
+
+def test_cached_errors_are_raised_as_fresh_instances():
+    cache = ResultCache(ttl=60)
+    cache.set_error(("rejected",), SearxAPIError(400, "Bad Request"))
+    errors = []
+    for _ in range(2):
+        with pytest.raises(SearxAPIError) as error:
+            cache.lookup(("rejected",))
+        errors.append(error.value)
+    first, second = errors
+    assert first is not second and type(first) is SearxAPIError
+    assert str(first) == str(second) == "Searx API returned an error: 400 Bad Request"
+    assert first.status == second.status == 400
+    assert cache.stats()["negative_hits"] == 2
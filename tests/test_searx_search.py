@@ -0,0 +1,38 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from stub_server import StubSearx  # noqa: E402
+
+from searxng.searx_search import SearxSearchWrapper  # noqa: E402
+from searxng.session import close_session  # noqa: E402
+
+
+def test_assigned_fields_reach_the_client():
+    wrapper = SearxSearchWrapper(searx_host="http://searx.invalid")
+    session = object()
+    wrapper.aiosession = session
+    wrapper.headers = {"User-Agent": "test"}
+    wrapper.unsecure = False
+    assert wrapper._client.aiosession is session
+    assert wrapper._client.headers == {"User-Agent": "test"}
+    assert not wrapper._client.unsecure
+
+
+def test_assigned_host_is_queried():
+    stub = StubSearx()
+
+    async def main():
+        url = await stub.start()
+        try:
+            wrapper = SearxSearchWrapper(searx_host="http://searx.invalid")
+            wrapper.searx_host = url
+            return await wrapper.aresults("assigned", num_results=3)
+        finally:
+            await stub.stop()
+            await close_session()
+
+    results = asyncio.run(main())
+    assert len(results) == 3 and stub.requests == 1